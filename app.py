@@ -1,68 +1,81 @@
 """Module to implement the Wordle game in Streamlit."""
 
-import logging
+import time
+
+_started = time.perf_counter()
+
+# pylint: disable=wrong-import-position
+import uuid
 
 import streamlit as st
-from akshara import varnakaarya as vk
-import yaml
-from logtail import LogtailHandler
 
-from evaluate import CellStatus, Compare
-from word_processor import Word
-from dictionary import get_fixed_length
+from dictionary import DICTIONARY
+from engine import (
+    MAX_ATTEMPTS,
+    WORD_LENGTH,
+    WORD_LIST,
+    GameSession,
+    GuessOutcome,
+    parse_guess,
+)
 from grid import render_grid
+from instrumentation import finish_rerun, stage, start_rerun
+from log_pipeline import get_logger
+from results import GameResult, get_results_store, today
+from session_store import get_store
+from verse_index import get_verse_index
 from utils import (
-    check_guess_word_length,
-    is_guess_word_in_dictionary,
-    is_word_previously_guessed,
+    get_ui_text,
     select_geuss,
+    show_invalid_guess,
     transliteration_options,
     wait_for_guess_confirmation,
 )
+from warmup import mark, start_warmup
+
+start_rerun()
+
+logger = get_logger(__name__, st.secrets["LOGGING_TOKEN"])
 
-handler = LogtailHandler(source_token=st.secrets["LOGGING_TOKEN"])
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-logger.handlers = []
-logger.addHandler(handler)
+# Load the word lists and caches while the first page is drawn.
+start_warmup(WORD_LIST, WORD_LENGTH, DICTIONARY)
+mark("imports", _started)
 
 
-WORD_LENGTH = 3
-MAX_ATTEMPTS = 10
+SHOW_REMAINING = True
 
-# Load the information about the game
-with open("ui.yml", "r", encoding="utf-8") as file:
-    all_text = yaml.safe_load(file)
+helper_text = get_ui_text()["helper_text"]
 
+if "session" not in st.session_state:
 
-helper_text = all_text["helper_text"]
+    # The game lives in the session store under the id in the URL, so a reload
+    # or another replica behind the load balancer picks it up again.
+    store = get_store()
+    session_id = st.query_params.get("game")
+    saved = store.get(session_id) if session_id else None
 
-if "true_word" not in st.session_state:
+    if saved is None:
+        session = GameSession.new(WORD_LENGTH, MAX_ATTEMPTS, WORD_LIST)
+        logger.info("True word: %s", session.state.secret)
 
-    info = get_fixed_length(WORD_LENGTH, filename="data/raamaayana.csv")
-    logger.info("True word: %s", info)
+        session_id = uuid.uuid4().hex
+        store.put(session_id, session.to_bytes())
+        st.query_params["game"] = session_id
+    else:
+        session = GameSession.restore(saved, WORD_LIST)
 
-    st.session_state.true_word = Word(info)
+    st.session_state.session_id = session_id
+    st.session_state.session = session
 
-    st.session_state.message = ""
     st.session_state.valid_guess = None
     st.session_state.awaiting_guess = False
-    st.session_state.current_row = 0
-    st.session_state.guesses = [
-        ["" for _ in range(WORD_LENGTH)] for _ in range(MAX_ATTEMPTS)
-    ]
-    st.session_state.guess_status = [
-        [(CellStatus.ABSENT, CellStatus.ABSENT) for _ in range(WORD_LENGTH)]
-        for _ in range(MAX_ATTEMPTS)
-    ]
-    st.session_state.game_over = False
-
     st.session_state.confirm_button_clicked = False
     st.session_state.options = []
-    st.session_state.previous_guesses = []
 
 
-true_word = st.session_state.true_word
+session = st.session_state.session
+game = session.state
+true_word = session.secret
 
 # Main App Interface
 st.title("Sanskrit Wordle")
@@ -105,68 +118,92 @@ with st.expander(
     )
 
 
-render_grid(WORD_LENGTH, MAX_ATTEMPTS, helper_text)
+with stage("render_grid"):
+    render_grid(game, helper_text)
+
+if SHOW_REMAINING and game.current_row and not game.game_over:
+    remaining = session.remaining
+    st.caption(f"{remaining} words are still possible.")
 
-if not st.session_state.game_over:
+if not game.game_over:
 
     guess = st.text_input("Enter your guess:")
 
     if st.button("Submit Guess"):
-        try:
-            vk.get_akshara(guess)
+        if parse_guess(guess):
             st.session_state.valid_guess = guess
-        except AssertionError:
-
-            transliteration_options(guess)
+        else:
+            transliteration_options(guess, WORD_LENGTH)
             wait_for_guess_confirmation()
 
+    if st.button("Hint"):
+        hint, remaining = session.hint()
+        if hint:
+            st.info(f"Try {hint}. {remaining} words are still possible.")
+
     if st.session_state.awaiting_guess:
         select_geuss()
 
     if st.session_state.valid_guess and not st.session_state.awaiting_guess:
-        guess_word = Word(st.session_state.valid_guess)
-
-        check_guess_word_length(guess_word, WORD_LENGTH)
-        is_guess_word_in_dictionary(guess_word)
-        is_word_previously_guessed(guess_word)
+        guess_word = parse_guess(st.session_state.valid_guess)
 
-        logger.info("Guess word: %s for True word: %s", guess_word.word, true_word.word)
-
-        compare = Compare(true_word, guess_word)
-        compare.compare()
-        st.session_state.guess_status[st.session_state.current_row] = compare.status
-        st.session_state.guesses[st.session_state.current_row] = guess_word.aksharas
-        st.session_state.previous_guesses.append(guess_word.word)
-        st.session_state.current_row += 1
-
-        if compare.status == [(CellStatus.CORRECT, CellStatus.CORRECT)] * WORD_LENGTH:
-            st.session_state.message += f"Congratulations! You have guessed the word correctly. Score: {MAX_ATTEMPTS - st.session_state.current_row + 1} / 10.\n"
-            st.session_state.game_over = True
-            logger.info(
-                "Score: %s for True Word: %s",
-                MAX_ATTEMPTS - st.session_state.current_row + 1,
-                true_word.word,
+        if guess_word is None:
+            outcome = GuessOutcome(
+                False, f"Invalid guess! {st.session_state.valid_guess} is not a word."
             )
+        else:
+            outcome = session.submit(guess_word)
+        if not outcome.valid:
+            show_invalid_guess(outcome)
 
-        if st.session_state.current_row == MAX_ATTEMPTS:
-            st.session_state.game_over = True
+    if st.session_state.valid_guess and not st.session_state.awaiting_guess:
+        with stage("log"):
             logger.info(
-                "Score: %s for True Word: %s",
-                MAX_ATTEMPTS - st.session_state.current_row,
-                true_word.word,
+                "Guess word: %s for True word: %s", guess_word.word, true_word.word
             )
 
-        if st.session_state.game_over:
-            st.session_state.message += f"## The word was {true_word.word}.\n"
+        get_store().put(st.session_state.session_id, session.to_bytes())
+
+        if outcome.game_over:
+            with stage("log"):
+                logger.info("Score: %s for True Word: %s", game.score, true_word.word)
+            get_results_store().record(GameResult.from_session(session))
 
         st.session_state.valid_guess = None  # Reset the valid guess for next input
+        finish_rerun()
         st.rerun()
 
-if st.session_state.game_over:
-    st.success(st.session_state.message)
+if game.game_over:
+
+    message = ""
+    if game.won:
+        message += f"Congratulations! You have guessed the word correctly. Score: {game.score} / 10.\n"
+    message += f"## The word was {true_word.word}.\n"
+    st.success(message)
+
+    verses = get_verse_index("data/shlokas.csv").search(true_word.word, limit=5)
+    if verses:
+        with st.expander(f"Verses with {true_word.word}"):
+            for verse in verses:
+                st.write(f"{verse.text} ({verse.reference})")
+
+    results = get_results_store()
+    word_stats = results.word_stats(true_word.word, WORD_LIST)
+    day_stats = results.day_stats(today(), WORD_LIST)
+    with st.expander("Statistics"):
+        word_col, day_col = st.columns(2)
+        word_col.metric(f"Games with {true_word.word}", word_stats.games)
+        word_col.metric("Won", f"{word_stats.win_rate:.0%}")
+        word_col.metric("Average score", f"{word_stats.average_score:.1f}")
+        day_col.metric("Games today", day_stats.games)
+        day_col.metric("Won", f"{day_stats.win_rate:.0%}")
+        day_col.metric("Average score", f"{day_stats.average_score:.1f}")
 
     if st.button("Play Again"):
+        get_store().delete(st.session_state.session_id)
+        del st.query_params["game"]
         st.session_state.clear()
+        finish_rerun()
         st.rerun()
 
 
@@ -177,14 +214,15 @@ with st.container():
     stars = st.feedback("stars")
     feedback = st.text_area("Comments", height=100)
 
-    if feedback:
-        logger.critical("Stars: %s", stars)
-
     if st.button("Submit Feedback"):
         st.write("Feedback submitted. Thank you!")
+        logger.critical("Stars: %s", stars)
         logger.critical("Feedback: %s", feedback)
         st.session_state.feedback_submitted = True
 
     if "feedback_submitted" in st.session_state:
         st.write("Thank you for your feedback!")
         st.session_state.feedback_submitted = False
+
+finish_rerun()
+mark("first_rerun", _started)
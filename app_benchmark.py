@@ -0,0 +1,368 @@
+"""Module to measure the latency of full reruns of app.py and backend.py.
+
+Every interaction is replayed headless with Streamlit's AppTest, so the
+script runs top to bottom, the grid is drawn and the session state makes its
+round trip as in the browser. app.py plays complete games, with a word not in
+the dictionary, a Romanized guess and a hint along the way, and backend.py
+selects a list, adds and removes words and saves it.
+
+It runs offline in a copy of data/ in a temporary directory, with a
+dictionary made of the word lists when data/words.csv is missing. The
+secrets, the Logtail uploads and the online transliteration are replaced by
+local fakes. The time of every interaction and of every rerun it triggered is
+recorded, and the p95 of the reruns can be compared with a stored baseline,
+failing when it got worse by more than the threshold.
+
+    python app_benchmark.py --output baseline.json
+    python app_benchmark.py --compare baseline.json --threshold 0.3
+"""
+
+import argparse
+import json
+import logging
+import os
+import pathlib
+import platform
+import random
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import log_pipeline
+from benchmark import LOWER, compare
+from lexicon import get_lexicon, read_words
+from log_pipeline import Sink
+from transliterate import candidates
+
+
+ROOT = pathlib.Path(__file__).resolve().parent
+GAMES = 5
+EDITS = 5
+SEED = 0
+TIMEOUT = 60
+PERCENTILES = (50, 95)
+
+# Full reruns vary more than the microbenchmarks, so only the p95 of the
+# reruns is checked, with a wider margin.
+CHECKED = ("app.rerun.p95_ms", "backend.rerun.p95_ms")
+THRESHOLD = 0.3
+
+# The list edited in backend.py and the words added to it.
+EDITED_LIST = "data/naamaraamaayana.csv"
+ADDED_WORDS = "data/raamaayana.csv"
+
+ROMANIZED = "rAma"
+UNKNOWN_TRIES = 5
+
+
+class FakeLogtailSink(Sink):
+    """Class to count the batches of records instead of uploading them."""
+
+    def __init__(self, source_token: str):
+        self.source_token = source_token
+        self.records = 0
+
+    def send(self, records: list[logging.LogRecord]) -> bool:
+        self.records += len(records)
+        return True
+
+
+def fake_transliterate_word(
+    word: str, lang_code: str = "sa"  # pylint: disable=unused-argument
+) -> list[str]:
+    """Return the offline readings of a word in place of the online ones."""
+    return list(candidates(word))
+
+
+def _install_fakes():
+    """Replace Logtail and the online transliteration by the local fakes."""
+
+    # pylint: disable=import-outside-toplevel
+    import google.transliteration
+
+    log_pipeline.LogtailSink = FakeLogtailSink
+    google.transliteration.transliterate_word = fake_transliterate_word
+
+
+def _fixture(workdir: pathlib.Path):
+    """Copy the data and texts the apps read into a working directory."""
+
+    shutil.copytree(ROOT / "data", workdir / "data")
+    shutil.copy(ROOT / "ui.yml", workdir / "ui.yml")
+
+    dictionary = workdir / "data" / "words.csv"
+    if not dictionary.exists():
+        words = {}
+        for filename in ("raamaayana.csv", "naamaraamaayana.csv", "amara.csv"):
+            words.update(dict.fromkeys(read_words(workdir / "data" / filename)))
+        dictionary.write_text(",".join(word for word in words if word), "utf-8")
+
+
+class Recorder:
+    """Class to time the interactions with an app and the reruns they trigger."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.interactions: dict[str, list[float]] = defaultdict(list)
+        self.reruns: list[float] = []
+        self._marks: list[float] = []
+
+    def mark(self):
+        """Note that the script asked for a rerun."""
+        self._marks.append(time.perf_counter())
+
+    def run(self, app: AppTest, interaction: str) -> AppTest:
+        """Run the script for an interaction, failing on an exception."""
+
+        self._marks = []
+        start = time.perf_counter()
+        app.run(timeout=TIMEOUT)
+        end = time.perf_counter()
+
+        if app.exception:
+            raise RuntimeError(f"{self.name} failed on {interaction}: {app.exception}")
+
+        self.interactions[interaction].append(end - start)
+        edges = [start, *self._marks, end]
+        self.reruns.extend(b - a for a, b in zip(edges, edges[1:]))
+
+        return app
+
+    def metrics(self) -> dict[str, tuple[float, str, str]]:
+        """Return the percentiles of the reruns and of every interaction."""
+
+        metrics = {}
+        for label, times in (("rerun", self.reruns), *self.interactions.items()):
+            if not times:
+                continue
+            values = np.percentile(times, PERCENTILES) * 1000
+            for percentile, value in zip(PERCENTILES, values.tolist()):
+                metrics[f"{self.name}.{label}.p{percentile}_ms"] = (value, "ms", LOWER)
+
+        return metrics
+
+
+@contextmanager
+def _recording_reruns(recorder: Recorder):
+    """Note every st.rerun of the scripts in a recorder."""
+
+    rerun = st.rerun
+
+    def recorded_rerun(*args, **kwargs):
+        recorder.mark()
+        rerun(*args, **kwargs)
+
+    st.rerun = recorded_rerun
+    try:
+        yield
+    finally:
+        st.rerun = rerun
+
+
+def _button(app: AppTest, label: str):
+    """Return the button of an app with a label."""
+    return next(button for button in app.button if button.label == label)
+
+
+def _text_input(app: AppTest, label: str):
+    """Return the text input of an app with a label."""
+    return next(widget for widget in app.text_input if widget.label == label)
+
+
+def _guess(recorder: Recorder, app: AppTest, guess: str, interaction: str):
+    """Type a guess and submit it."""
+
+    _text_input(app, "Enter your guess:").input(guess)
+    _button(app, "Submit Guess").click()
+    recorder.run(app, interaction)
+
+
+def play_game(recorder: Recorder, app: AppTest, rng: random.Random):
+    """Play a game to the end, then start the next one."""
+
+    session = app.session_state["session"]
+    secret = session.secret.word
+
+    # The secret with its Aksharas shuffled, if that is not a word.
+    dictionary = get_lexicon(session.dictionary)
+    aksharas = list(session.secret.aksharas)
+    for _ in range(UNKNOWN_TRIES):
+        rng.shuffle(aksharas)
+        if "".join(aksharas) not in dictionary:
+            _guess(recorder, app, "".join(aksharas), "unknown_guess")
+            break
+
+    _guess(recorder, app, ROMANIZED, "romanized_guess")
+    if app.selectbox:
+        _button(app, "Confirm Guess").click()
+        recorder.run(app, "confirm_guess")
+
+    _button(app, "Hint").click()
+    recorder.run(app, "hint")
+
+    while not session.game_over and session.state.current_row < 3:
+        rows = session.index.indices(session.candidates)
+        words = [session.index.lexicon.words[int(row)] for row in rows]
+        guess = rng.choice([word for word in words if word != secret] or [secret])
+        _guess(recorder, app, guess, "guess")
+
+    if not session.game_over:
+        _guess(recorder, app, secret, "guess")
+
+    _button(app, "Play Again").click()
+    recorder.run(app, "play_again")
+
+
+def bench_app(games: int = GAMES, seed: int = SEED) -> Recorder:
+    """Play complete games in app.py."""
+
+    rng = random.Random(seed)
+
+    app = AppTest.from_file(str(ROOT / "app.py"), default_timeout=TIMEOUT)
+    app.secrets["LOGGING_TOKEN"] = "offline"
+
+    # The first game imports and warms everything up, and is not counted.
+    warmup = Recorder("app")
+    warmup.run(app, "cold_start")
+    play_game(warmup, app, rng)
+
+    recorder = Recorder("app")
+    with _recording_reruns(recorder):
+        for _ in range(games):
+            play_game(recorder, app, rng)
+
+    recorder.interactions["cold_start"] = warmup.interactions["cold_start"]
+    return recorder
+
+
+def edit_list(
+    recorder: Recorder,
+    app: AppTest,
+    added: str | None = None,
+    removed: str | None = None,
+):
+    """Select the edited list, add or remove a word and save it."""
+
+    # After a save the list is only unselected on the next rerun.
+    if not app.selectbox:
+        recorder.run(app, "reload")
+
+    app.selectbox[0].select(EDITED_LIST)
+    _button(app, "Select").click()
+    recorder.run(app, "select")
+
+    if added is not None:
+        _text_input(app, "Enter the new word").input(added)
+        _button(app, "Add").click()
+        recorder.run(app, "add")
+
+    if removed is not None:
+        _text_input(app, "Enter the word to remove").input(removed)
+        _button(app, "Remove").click()
+        recorder.run(app, "remove")
+
+    _button(app, "Save").click()
+    recorder.run(app, "save")
+
+
+def bench_backend(edits: int = EDITS, seed: int = SEED) -> Recorder:
+    """Edit and save a word list in backend.py."""
+
+    rng = random.Random(seed)
+    present = set(read_words(EDITED_LIST))
+    words = [word for word in read_words(ADDED_WORDS) if word not in present]
+
+    app = AppTest.from_file(str(ROOT / "backend.py"), default_timeout=TIMEOUT)
+
+    warmup = Recorder("backend")
+    warmup.run(app, "cold_start")
+
+    recorder = Recorder("backend")
+    with _recording_reruns(recorder):
+        # Every word added is removed again, so the list ends as it started.
+        for word in rng.sample(words, edits):
+            edit_list(recorder, app, added=word)
+            edit_list(recorder, app, removed=word)
+
+    recorder.interactions["cold_start"] = warmup.interactions["cold_start"]
+    return recorder
+
+
+def run(games: int = GAMES, edits: int = EDITS, seed: int = SEED) -> dict:
+    """Run both apps in a temporary copy of the data and return the results."""
+
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as workdir:
+
+        _fixture(pathlib.Path(workdir))
+        os.chdir(workdir)
+        try:
+            _install_fakes()
+            metrics = {}
+            metrics.update(bench_app(games, seed).metrics())
+            metrics.update(bench_backend(edits, seed).metrics())
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "streamlit": st.__version__,
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "metrics": {
+            name: {"value": value, "unit": unit, "better": better}
+            for name, (value, unit, better) in metrics.items()
+        },
+    }
+
+
+def main():
+    """Replay games and word list edits and report the latency of every rerun."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--games", type=int, default=GAMES)
+    parser.add_argument("--edits", type=int, default=EDITS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", type=pathlib.Path)
+    parser.add_argument("--compare", type=pathlib.Path)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    results = run(args.games, args.edits, args.seed)
+
+    for name, metric in results["metrics"].items():
+        print(f"{name:<40} {metric['value']:>10,.2f} {metric['unit']}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.compare:
+
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        results["metrics"] = {
+            name: metric
+            for name, metric in results["metrics"].items()
+            if name in CHECKED
+        }
+        regressions = compare(baseline, results, args.threshold)
+
+        for name, before, after, change in regressions:
+            print(
+                f"REGRESSION {name}: {before:,.2f} -> {after:,.2f} ({change:.0%} worse)"
+            )
+
+        raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
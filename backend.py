@@ -1,11 +1,10 @@
 """Backend App for the Word Guessing Game"""
 
 import pathlib
-import time
 import streamlit as st
 
-from akshara import varnakaarya as vk
 from dictionary import is_word_in_dictionary
+from editor import WordListEditor
 
 
 files = pathlib.Path("data").rglob("*.csv")
@@ -15,7 +14,6 @@ if "current_file" not in st.session_state:
     st.session_state.current_file_index = 0
     st.session_state.current_file = files[0]
     st.session_state.file_selected = False
-    st.session_state.new_words = set()
 
 filenames = [file.as_posix() for file in files]
 
@@ -36,22 +34,19 @@ if not st.session_state.file_selected:
 if st.session_state.file_selected:
     current_file = st.session_state.current_file
 
-    with open(current_file, "r", encoding="utf-8") as file:
-        words = file.readlines()[0]
+    # The words and their Akshara counts are read once per selected file and
+    # then kept up to date by the editor.
+    if st.session_state.get("editor_file") != current_file:
+        st.session_state.editor = WordListEditor.open(current_file)
+        st.session_state.editor_file = current_file
 
-    words = words.split(",")
-    words = set(words)
-
-    words = words.union(st.session_state.new_words)
-
-    aksharas = [len(vk.get_akshara(word)) for word in words]
-    letterwise_counts = {i: aksharas.count(i) for i in set(aksharas)}
+    editor = st.session_state.editor
 
     st.write(f"## Editing {current_file}")
 
     st.write("### Summary")
-    st.write(f"Current number of words: {len(words)}")
-    for key, value in letterwise_counts.items():
+    st.write(f"Current number of words: {len(editor)}")
+    for key, value in sorted(editor.histogram.items()):
         st.write(f"Number of words with {key} aksharas: {value}")
 
     st.write("### Add a word")
@@ -60,37 +55,46 @@ if st.session_state.file_selected:
 
         if not is_word_in_dictionary(new_word):
             st.error("Word not found in the dictionary")
-            time.sleep(5)
 
-        elif new_word in words:
+        elif new_word in editor:
             st.error("Word already present in the file")
-            time.sleep(5)
-        else:
-            words.add(new_word)
-            st.session_state.new_words.add(new_word)
 
-        st.rerun()
+        else:
+            editor.add(new_word)
+            st.rerun()
+
+    st.write("### Import words")
+    imported = st.text_area("Enter the words, separated by commas or new lines")
+    length = st.number_input("Number of aksharas (0 for any)", min_value=0, value=0)
+    if st.button("Import"):
+        report = editor.import_words(
+            imported.replace(",", "\n").splitlines(), length=length or None
+        )
+        st.write(f"Added {len(report.added)} words")
+        for label, skipped in (
+            ("already present", report.duplicates),
+            ("not found in the dictionary", report.unknown),
+            ("with another number of aksharas", report.wrong_length),
+            ("that could not be split into aksharas", report.invalid),
+        ):
+            if skipped:
+                st.write(f"Skipped {len(skipped)} words {label}: {', '.join(skipped)}")
 
     st.write("### Words added so far")
-    for word in st.session_state.new_words:
+    for word in editor.added:
         st.write(word)
 
     st.write("### Remove a word")
     word_to_remove = st.text_input("Enter the word to remove")
     if st.button("Remove"):
-        words.remove(word_to_remove)
-        if word_to_remove in st.session_state.new_words:
-            st.session_state.new_words.remove(word_to_remove)
-
-        st.rerun()
+        if editor.remove(word_to_remove):
+            st.rerun()
+        st.error("Word not present in the file")
 
     st.write("### Save the changes")
     if st.button("Save"):
-        with open(current_file, "w", encoding="utf-8") as file:
-            file.write(",".join(words))
+        editor.save()
 
-        st.write("Changes saved successfully")
-        st.session_state.new_words = set()
+        st.success("Changes saved successfully")
+        del st.session_state.editor_file
         st.session_state.file_selected = False
-        time.sleep(5)
-        st.rerun()
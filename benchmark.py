@@ -0,0 +1,377 @@
+"""Module to benchmark the word, scoring and dictionary functions on every corpus.
+
+Every benchmark runs offline on the word lists in data/ with a fixed seed.
+Like timeit, a measurement loops over the function long enough for the clock
+to be reliable, and the best of a few is kept. A shared machine also changes
+speed for seconds at a time, and the same code runs faster or slower in one
+process than in the next, so the whole suite is run in several rounds, each
+in a new process, and the median of the rounds is reported.
+
+The derived files are written to an empty temporary cache directory, so a
+run does not depend on what cache/ holds, and the compiled lexicons are
+either built there first or not used at all, as recorded in the results. Results are written as JSON, and a run can be
+compared with a stored baseline made the same way, failing when any metric
+got worse by more than the threshold.
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --compare baseline.json --threshold 0.2
+    python benchmark.py --no-compiled
+"""
+
+import argparse
+import json
+import pathlib
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import compiled_lexicon
+import dictionary
+import lexicon
+import word_processor
+from evaluate import Compare, _score, batch_score, encode_lexicon
+from lexicon import Lexicon, cache_path, get_lexicon, read_words
+from synonyms import SUFFIX as SYNONYMS_SUFFIX
+from synonyms import SynonymGraph
+from word_processor import Word
+
+
+CORPORA = [
+    "data/raamaayana.csv",
+    "data/naamaraamaayana.csv",
+    "data/amara.csv",
+    "data/synonyms.csv",
+]
+
+SEED = 0
+ROUNDS = 8
+REPEATS = 3
+MIN_TIME = 0.05
+SAMPLE = 500
+LOOKUPS = 2000
+LENGTH = 3
+THRESHOLD = 0.2
+
+HIGHER, LOWER = "higher", "lower"
+
+
+def _loop_time(
+    run: Callable[[], None], number: int, setup: Callable[[], None] | None = None
+) -> float:
+    """Return the total time of some runs of a function, leaving out the setup."""
+
+    total = 0.0
+    for _ in range(number):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        total += time.perf_counter() - start
+
+    return total
+
+
+def _best_time(
+    run: Callable[[], None],
+    repeats: int = REPEATS,
+    setup: Callable[[], None] | None = None,
+) -> float:
+    """Return the best time of a run of a function, in seconds.
+
+    Every repeat runs the function as many times as it takes to last at least
+    MIN_TIME, since the slower repeats only measure what else the machine
+    was doing.
+    """
+
+    # The first run fills the caches the function relies on and is not counted.
+    run()
+
+    number = 1
+    while (total := _loop_time(run, number, setup)) < MIN_TIME:
+        number *= 2
+
+    times = [total / number]
+    for _ in range(repeats - 1):
+        times.append(_loop_time(run, number, setup) / number)
+
+    return min(times)
+
+
+def _throughput(
+    items: list, run: Callable, setup: Callable[[], None] | None = None
+) -> float:
+    """Return how many items per second a function handles."""
+    return len(items) / _best_time(lambda: [run(item) for item in items], setup=setup)
+
+
+def _clear_word_caches():
+    """Forget every decomposition, so that Word has to compute them again."""
+
+    word_processor.get_vinyaasa.cache_clear()
+    word_processor.get_word.cache_clear()
+    for compiled in compiled_lexicon.open_compiled():
+        compiled.akshara.cache_clear()
+
+
+def _latency_us(items: list, run: Callable) -> float:
+    """Return the mean time per item of a function, in microseconds."""
+    return _best_time(lambda: [run(item) for item in items]) / len(items) * 1e6
+
+
+@contextmanager
+def _dictionary(filename: str):
+    """Point the dictionary at a corpus for the duration of a benchmark."""
+
+    previous = dictionary.DICTIONARY
+    dictionary.DICTIONARY = filename
+    try:
+        yield
+    finally:
+        dictionary.DICTIONARY = previous
+
+
+def bench_corpus(filename: str) -> dict[str, tuple[float, str, str]]:
+    """Return the metrics of one corpus as (value, unit, better) triples."""
+
+    rng = random.Random(SEED)
+    name = pathlib.Path(filename).stem
+    metrics = {}
+
+    # A new Lexicon, since the shared one is only loaded once.
+    metrics[f"{name}.load_ms"] = (
+        _best_time(
+            lambda: Lexicon(filename, tuple(read_words(filename))).bucket(LENGTH)
+        )
+        * 1e3,
+        "ms",
+        LOWER,
+    )
+
+    lexicon = get_lexicon(filename)
+    bucket = lexicon.bucket(LENGTH)
+
+    words = rng.sample(lexicon.words, min(SAMPLE, len(lexicon.words)))
+    metrics[f"{name}.word_per_s"] = (
+        _throughput(words, Word, _clear_word_caches),
+        "words/s",
+        HIGHER,
+    )
+
+    if len(bucket) > 1:
+
+        pairs = [tuple(rng.sample(bucket, 2)) for _ in range(SAMPLE)]
+
+        def compare(pair):
+            Compare(*pair).compare()
+
+        metrics[f"{name}.compare_per_s"] = (
+            _throughput(pairs, compare),
+            "pairs/s",
+            HIGHER,
+        )
+        metrics[f"{name}.score_per_s"] = (
+            _throughput(pairs, lambda pair: _score.__wrapped__(*pair)),
+            "pairs/s",
+            HIGHER,
+        )
+
+        encoded = encode_lexicon(bucket)
+        guesses = rng.sample(bucket, min(20, len(bucket)))
+        metrics[f"{name}.batch_score_per_s"] = (
+            _throughput(guesses, lambda guess: batch_score(guess, encoded))
+            * len(bucket),
+            "pairs/s",
+            HIGHER,
+        )
+
+        metrics[f"{name}.get_fixed_length_us"] = (
+            _latency_us(
+                range(LOOKUPS), lambda _: dictionary.get_fixed_length(LENGTH, filename)
+            ),
+            "us",
+            LOWER,
+        )
+
+    # Half of the lookups are misses, made by reversing real words.
+    lookups = [
+        word if i % 2 else word[::-1]
+        for i, word in enumerate(rng.choices(lexicon.words, k=LOOKUPS))
+    ]
+    with _dictionary(filename):
+        metrics[f"{name}.is_word_in_dictionary_us"] = (
+            _latency_us(lookups, dictionary.is_word_in_dictionary),
+            "us",
+            LOWER,
+        )
+
+    return metrics
+
+
+def bench_synonyms() -> dict[str, tuple[float, str, str]]:
+    """Return the metrics of the synonym lookups."""
+
+    rng = random.Random(SEED)
+
+    # The shared graph is built and saved first, and its binary copy is timed.
+    graph = dictionary.get_synonym_graph()
+    path = cache_path("data/synonyms.csv", SYNONYMS_SUFFIX)
+    load = _best_time(lambda: SynonymGraph.load(path)) * 1e3
+
+    words = rng.choices(graph.words, k=LOOKUPS)
+
+    return {
+        "synonym_graph.load_ms": (load, "ms", LOWER),
+        "synonym_graph.get_synonyms_us": (
+            _latency_us(words, dictionary.get_synonyms),
+            "us",
+            LOWER,
+        ),
+    }
+
+
+@contextmanager
+def _isolated_cache(corpora: list[str], compiled: bool):
+    """Point the derived files at an empty directory, building the compiled lexicons."""
+
+    previous = lexicon.CACHE_DIR
+
+    with tempfile.TemporaryDirectory() as cache:
+
+        lexicon.CACHE_DIR = pathlib.Path(cache)
+        if compiled:
+            for filename in corpora:
+                compiled_lexicon.build(filename)
+        compiled_lexicon.reset_compiled()
+
+        try:
+            yield
+        finally:
+            lexicon.CACHE_DIR = previous
+            compiled_lexicon.reset_compiled()
+
+
+def run_round(
+    corpora: list[str], compiled: bool
+) -> tuple[dict[str, tuple[float, str, str]], float]:
+    """Run every benchmark once and return the metrics and the peak RSS in MB."""
+
+    metrics = {}
+    with _isolated_cache(corpora, compiled):
+        for filename in corpora:
+            metrics.update(bench_corpus(filename))
+        metrics.update(bench_synonyms())
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak /= 1024 * (1024 if sys.platform == "darwin" else 1)
+
+    return metrics, peak
+
+
+def run(
+    corpora: list[str] = CORPORA, compiled: bool = True, rounds: int = ROUNDS
+) -> dict:
+    """Run every benchmark and return the results."""
+
+    measured = []
+
+    # One round at a time, each in a process of its own.
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        for _ in range(rounds):
+            measured.append(executor.submit(run_round, corpora, compiled).result())
+
+    metrics = {
+        name: (statistics.median(m[name][0] for m, _ in measured), unit, better)
+        for name, (_, unit, better) in measured[0][0].items()
+    }
+    metrics["peak_rss_mb"] = (max(peak for _, peak in measured), "MB", LOWER)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "compiled_lexicon": compiled,
+            "rounds": rounds,
+        },
+        "metrics": {
+            name: {"value": value, "unit": unit, "better": better}
+            for name, (value, unit, better) in metrics.items()
+        },
+    }
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float = THRESHOLD
+) -> list[tuple[str, float, float, float]]:
+    """Return the metrics that got worse than the baseline by more than a threshold."""
+
+    regressions = []
+
+    for name, metric in current["metrics"].items():
+
+        before = baseline["metrics"].get(name)
+        if before is None or not before["value"]:
+            continue
+
+        change = metric["value"] / before["value"] - 1
+        if metric["better"] == HIGHER:
+            change = -change
+
+        if change > threshold:
+            regressions.append((name, before["value"], metric["value"], change))
+
+    return regressions
+
+
+def main():
+    """Benchmark every corpus and optionally compare with a baseline."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--output", type=pathlib.Path)
+    parser.add_argument("--compare", type=pathlib.Path)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument(
+        "--no-compiled", dest="compiled", action="store_false", default=True
+    )
+    parser.add_argument("corpora", nargs="*", default=CORPORA)
+    args = parser.parse_args()
+
+    results = run(args.corpora, args.compiled, args.rounds)
+
+    for name, metric in results["metrics"].items():
+        print(f"{name:<40} {metric['value']:>14,.2f} {metric['unit']}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.compare:
+
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+
+        if baseline["meta"].get("compiled_lexicon") != args.compiled:
+            raise SystemExit(
+                "The baseline was not made with the same compiled lexicon setting."
+            )
+
+        regressions = compare(baseline, results, args.threshold)
+
+        for name, before, after, change in regressions:
+            print(
+                f"REGRESSION {name}: {before:,.2f} -> {after:,.2f} ({change:.0%} worse)"
+            )
+
+        raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
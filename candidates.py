@@ -0,0 +1,191 @@
+"""Module to count the words still consistent with the feedback so far.
+
+Every word of a list gets one bit, and the index keeps one bitset (a Python
+integer) per Svara at a position, per Vyanjana signature at a position, per
+Vyanjana at a position, per Vyanjana anywhere and per Svara count. Each
+guess only ever rules words out, so its bitsets are intersected with the
+previous result and the few words left are checked exactly with
+`batch_score`.
+"""
+
+import pathlib
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from evaluate import (
+    CellStatus,
+    EncodedLexicon,
+    batch_score,
+    encode,
+    encode_lexicon,
+    pack_status,
+    varna_id,
+)
+from lexicon import BucketCache, get_lexicon
+from word_processor import get_word
+
+
+POSITIVE = (CellStatus.CORRECT, CellStatus.PRESENT)
+
+
+def _or(bitsets) -> int:
+    """Return the union of bitsets."""
+
+    union = 0
+    for bitset in bitsets:
+        union |= bitset
+
+    return union
+
+
+@dataclass
+class CandidateIndex:
+    """Class to hold the bitsets of a word list of one length."""
+
+    filename: str
+    length: int
+
+    lexicon: EncodedLexicon = field(init=False, repr=False)
+    all: int = field(init=False)
+
+    svara_at: dict[tuple[int, int], int] = field(default_factory=dict, repr=False)
+    svara_count: dict[tuple[int, int], int] = field(default_factory=dict, repr=False)
+    signature_at: dict[tuple[int, tuple[int, ...]], int] = field(
+        default_factory=dict, repr=False
+    )
+    vyanjana_at: dict[tuple[int, int], int] = field(default_factory=dict, repr=False)
+    vyanjana_in: dict[int, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+
+        words = get_lexicon(self.filename).bucket(self.length)
+
+        self.lexicon = encode_lexicon(words)
+        self.all = (1 << len(words)) - 1
+
+        for row, word in enumerate(words):
+
+            bit = 1 << row
+            encoded = encode(word)
+            svara_counts = {}
+
+            for position, svara in enumerate(encoded.svaras):
+                self._add(self.svara_at, (position, svara), bit)
+                svara_counts[svara] = svara_counts.get(svara, 0) + 1
+
+            # A word with k copies of a Svara is in the bitsets for 1..k.
+            for svara, count in svara_counts.items():
+                for k in range(1, count + 1):
+                    self._add(self.svara_count, (svara, k), bit)
+
+            for position, signature in enumerate(encoded.signatures):
+                self._add(self.signature_at, (position, signature), bit)
+
+            for position, vyanjanas in enumerate(get_word(word).vyanjanas):
+                for vyanjana in vyanjanas:
+                    self._add(self.vyanjana_at, (position, varna_id(vyanjana)), bit)
+                    self._add(self.vyanjana_in, varna_id(vyanjana), bit)
+
+    @staticmethod
+    def _add(bitsets: dict, key, bit: int):
+        """Set the bit of a word in the bitset of a key."""
+        bitsets[key] = bitsets.get(key, 0) | bit
+
+    def constraint(
+        self, guess: str, status: list[tuple[CellStatus, CellStatus]]
+    ) -> int:
+        """Return the bitset of words not ruled out by the feedback for a guess.
+
+        Only rules that hold for any feedback, including the duplicate rules of
+        Compare.degrade, are used, so no consistent word is ever ruled out.
+        """
+
+        encoded = encode(guess)
+        vyanjanas = [[varna_id(v) for v in cell] for cell in get_word(guess).vyanjanas]
+
+        mask = self.all
+        svara_cells = {}
+
+        for position, (vyanjana_status, svara_status) in enumerate(status):
+
+            svara = encoded.svaras[position]
+            at = self.svara_at.get((position, svara), 0)
+            mask &= at if svara_status == CellStatus.CORRECT else ~at
+            svara_cells.setdefault(svara, []).append(svara_status)
+
+            signature = self.signature_at.get(
+                (position, encoded.signatures[position]), 0
+            )
+            if vyanjana_status == CellStatus.CORRECT:
+                mask &= signature
+                continue
+
+            mask &= ~signature
+            at = _or(
+                self.vyanjana_at.get((position, v), 0) for v in vyanjanas[position]
+            )
+
+            # MISSING is decided before the duplicate rules and never changed.
+            if vyanjana_status == CellStatus.MISSING:
+                mask &= at
+                continue
+
+            mask &= ~at
+            if vyanjana_status == CellStatus.PRESENT:
+                mask &= _or(self.vyanjana_in.get(v, 0) for v in vyanjanas[position])
+
+        # A Svara shown k times as correct or present occurs at least k times,
+        # and exactly k times if it is also shown as absent somewhere.
+        for svara, statuses in svara_cells.items():
+
+            k = sum(svara_status in POSITIVE for svara_status in statuses)
+            if k:
+                mask &= self.svara_count.get((svara, k), 0)
+            if CellStatus.ABSENT in statuses:
+                mask &= ~self.svara_count.get((svara, k + 1), 0)
+
+        return mask
+
+    def indices(self, mask: int) -> np.ndarray:
+        """Return the row numbers of the words in a bitset."""
+
+        size = len(self.lexicon)
+        bits = np.frombuffer(mask.to_bytes((size + 7) // 8, "little"), np.uint8)
+
+        return np.flatnonzero(np.unpackbits(bits, bitorder="little")[:size])
+
+    def narrow(
+        self, mask: int, guess: str, status: list[tuple[CellStatus, CellStatus]]
+    ) -> int:
+        """Return the words of a bitset that are consistent with one more guess."""
+
+        mask &= self.constraint(guess, status)
+
+        rows = self.indices(mask)
+        if len(rows) == 0:
+            return 0
+
+        codes = batch_score(guess, self.lexicon.subset(rows))
+
+        return self.bitset(rows[codes == pack_status(status)])
+
+    def bitset(self, rows: np.ndarray) -> int:
+        """Return the bitset of some row numbers."""
+
+        bits = np.zeros(len(self.lexicon), dtype=np.uint8)
+        bits[rows] = 1
+
+        return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+    def words(self, mask: int) -> list[str]:
+        """Return the words in a bitset."""
+        return [self.lexicon.words[row] for row in self.indices(mask)]
+
+
+_indexes = BucketCache(CandidateIndex)
+
+
+def get_candidate_index(length: int, filename: pathlib.Path) -> CandidateIndex:
+    """Return the shared candidate index for a word list and length."""
+    return _indexes.get(length, filename)
@@ -0,0 +1,326 @@
+"""Module to compile word lists into a memory-mapped decomposition table.
+
+The compiled file stores every word of a list together with its Aksharas and
+the Vinyaasa of each Akshara as interned integer ids. All sections are arrays
+of little-endian unsigned integers, aligned to four bytes:
+
+    header      magic, version, number of varnas, aksharas and words
+    varnas      offsets into the varna text, followed by the UTF-8 text
+    aksharas    offsets into the akshara text and into the varna ids
+    words       offsets into the word text and into the akshara ids,
+                sorted by the UTF-8 bytes of the word for binary search
+
+Build the files with `python compiled_lexicon.py [data/*.csv]`. Sources
+holding verses rather than words, like shlokas.csv, are not compiled.
+"""
+
+import argparse
+import mmap
+import pathlib
+import struct
+import sys
+import threading
+from array import array
+from functools import lru_cache
+
+from akshara import varnakaarya as vk
+
+from lexicon import cache_path, read_words
+
+
+MAGIC = b"WLEX"
+VERSION = 1
+HEADER = struct.Struct("<4sIIII")
+SUFFIX = "lex"
+
+# Sources whose lines are not words.
+NOT_WORD_LISTS = frozenset({"shlokas.csv"})
+
+
+def _pad(blob: bytes) -> bytes:
+    """Pad a blob to a multiple of four bytes."""
+    return blob + b"\0" * (-len(blob) % 4)
+
+
+def _strings(strings: list[str]) -> tuple[array, bytes]:
+    """Return the offsets and the UTF-8 text of a list of strings."""
+
+    offsets = array("I", [0])
+    blob = bytearray()
+
+    for string in strings:
+        blob.extend(string.encode("utf-8"))
+        offsets.append(len(blob))
+
+    return offsets, bytes(blob)
+
+
+def compile_words(words: list[str]) -> bytes:
+    """Compile a list of words into the binary lexicon format."""
+
+    if sys.byteorder != "little":
+        raise RuntimeError("Compiled lexicons are only written on little-endian hosts.")
+
+    varna_ids: dict[str, int] = {}
+    akshara_ids: dict[str, int] = {}
+    akshara_varnas: list[list[int]] = []
+    entries: dict[bytes, list[int]] = {}
+
+    for word in words:
+
+        key = word.encode("utf-8")
+        if key in entries:
+            continue
+
+        try:
+            aksharas = vk.get_akshara(word)
+        except AssertionError:
+            continue
+
+        for akshara in aksharas:
+            if akshara not in akshara_ids:
+                akshara_ids[akshara] = len(akshara_ids)
+                akshara_varnas.append(
+                    [
+                        varna_ids.setdefault(varna, len(varna_ids))
+                        for varna in vk.get_vinyaasa(akshara)
+                    ]
+                )
+
+        entries[key] = [akshara_ids[akshara] for akshara in aksharas]
+
+    varna_offsets, varna_text = _strings(list(varna_ids))
+    akshara_offsets, akshara_text = _strings(list(akshara_ids))
+
+    vinyaasa_offsets = array("I", [0])
+    vinyaasas = array("I")
+    for ids in akshara_varnas:
+        vinyaasas.extend(ids)
+        vinyaasa_offsets.append(len(vinyaasas))
+
+    word_offsets = array("I", [0])
+    word_text = bytearray()
+    word_akshara_offsets = array("I", [0])
+    word_aksharas = array("I")
+    for key in sorted(entries):
+        word_text.extend(key)
+        word_offsets.append(len(word_text))
+        word_aksharas.extend(entries[key])
+        word_akshara_offsets.append(len(word_aksharas))
+
+    sections = [
+        HEADER.pack(MAGIC, VERSION, len(varna_ids), len(akshara_ids), len(entries)),
+        varna_offsets.tobytes(),
+        _pad(varna_text),
+        akshara_offsets.tobytes(),
+        _pad(akshara_text),
+        vinyaasa_offsets.tobytes(),
+        vinyaasas.tobytes(),
+        word_offsets.tobytes(),
+        _pad(bytes(word_text)),
+        word_akshara_offsets.tobytes(),
+        word_aksharas.tobytes(),
+    ]
+
+    return b"".join(sections)
+
+
+def build(filename: pathlib.Path) -> pathlib.Path:
+    """Compile a word list into the cache directory and return its path."""
+
+    path = cache_path(filename, SUFFIX)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    blob = compile_words(read_words(filename))
+
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(blob)
+    tmp.replace(path)
+
+    return path
+
+
+def word_lists(data_dir: pathlib.Path = pathlib.Path("data")) -> list[pathlib.Path]:
+    """Return the sources of a directory that are lists of words."""
+
+    return [
+        filename
+        for filename in sorted(pathlib.Path(data_dir).glob("*.csv"))
+        if filename.name not in NOT_WORD_LISTS
+    ]
+
+
+class CompiledLexicon:
+    """Class to read the decompositions of a memory-mapped compiled lexicon."""
+
+    def __init__(self, path: pathlib.Path):
+
+        self.path = pathlib.Path(path)
+
+        with open(self.path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_varnas, n_aksharas, n_words = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a compiled lexicon.")
+
+        view = memoryview(self._mmap)
+        position = HEADER.size
+
+        def ints(count: int) -> memoryview:
+            nonlocal position
+            section = view[position : position + 4 * count].cast("I")
+            position += 4 * count
+            return section
+
+        def text(size: int) -> memoryview:
+            nonlocal position
+            section = view[position : position + size]
+            position += size + (-size % 4)
+            return section
+
+        varna_offsets = ints(n_varnas + 1)
+        varna_text = text(varna_offsets[-1])
+        self.varnas = tuple(
+            str(varna_text[varna_offsets[i] : varna_offsets[i + 1]], "utf-8")
+            for i in range(n_varnas)
+        )
+
+        self._akshara_offsets = ints(n_aksharas + 1)
+        self._akshara_text = text(self._akshara_offsets[-1])
+        self._vinyaasa_offsets = ints(n_aksharas + 1)
+        self._vinyaasas = ints(self._vinyaasa_offsets[-1])
+
+        self._word_offsets = ints(n_words + 1)
+        self._word_text = text(self._word_offsets[-1])
+        self._word_akshara_offsets = ints(n_words + 1)
+        self._word_aksharas = ints(self._word_akshara_offsets[-1])
+
+        self.size = n_words
+        self.akshara = lru_cache(maxsize=None)(self._akshara)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _akshara(self, index: int) -> tuple[str, tuple[str, ...]]:
+        """Return an Akshara and its Vinyaasa for an akshara id."""
+
+        start, end = self._akshara_offsets[index], self._akshara_offsets[index + 1]
+        akshara = str(self._akshara_text[start:end], "utf-8")
+
+        start, end = self._vinyaasa_offsets[index], self._vinyaasa_offsets[index + 1]
+        vinyaasa = tuple(self.varnas[i] for i in self._vinyaasas[start:end])
+
+        return akshara, vinyaasa
+
+    def _find(self, key: bytes) -> int:
+        """Return the index of a word in the sorted word table, or -1."""
+
+        offsets = self._word_offsets
+        low, high = 0, self.size
+
+        while low < high:
+            middle = (low + high) // 2
+            candidate = bytes(self._word_text[offsets[middle] : offsets[middle + 1]])
+            if candidate < key:
+                low = middle + 1
+            elif candidate > key:
+                high = middle
+            else:
+                return middle
+
+        return -1
+
+    def lookup(self, word: str) -> list[tuple[str, tuple[str, ...]]] | None:
+        """Return the Aksharas of a word with their Vinyaasas, if compiled."""
+
+        index = self._find(word.encode("utf-8"))
+        if index < 0:
+            return None
+
+        start = self._word_akshara_offsets[index]
+        end = self._word_akshara_offsets[index + 1]
+
+        return [self.akshara(i) for i in self._word_aksharas[start:end]]
+
+
+def _open(filename: pathlib.Path) -> CompiledLexicon | None:
+    """Open the compiled lexicon of a source, rebuilding it if it is stale."""
+
+    path = cache_path(filename, SUFFIX)
+    if not path.exists():
+        return None
+
+    try:
+        return CompiledLexicon(path)
+    except (ValueError, struct.error):
+        # Written by another version of this module, or cut short.
+        pass
+
+    try:
+        return CompiledLexicon(build(filename))
+    except OSError:
+        return None
+
+    return path
+
+
+_compiled: list[CompiledLexicon] | None = None
+_compiled_lock = threading.Lock()
+
+
+def open_compiled(
+    data_dir: pathlib.Path = pathlib.Path("data"),
+) -> list[CompiledLexicon]:
+    """Open the up-to-date compiled lexicons of every word list, once per process."""
+
+    global _compiled
+
+    if _compiled is None:
+        with _compiled_lock:
+            if _compiled is None:
+                compiled = [_open(filename) for filename in word_lists(data_dir)]
+                _compiled = [lexicon for lexicon in compiled if lexicon is not None]
+
+    return _compiled
+
+
+def reset_compiled():
+    """Forget the compiled lexicons opened, so the next lookup opens them again."""
+
+    global _compiled
+
+    with _compiled_lock:
+        _compiled = None
+
+
+def lookup(word: str) -> list[tuple[str, tuple[str, ...]]] | None:
+    """Return the precomputed decomposition of a word from any compiled lexicon."""
+
+    for compiled in open_compiled():
+        entry = compiled.lookup(word)
+        if entry is not None:
+            return entry
+
+    return None
+
+
+def main():
+    """Compile the given word lists."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "files",
+        nargs="*",
+        type=pathlib.Path,
+        default=word_lists(),
+    )
+    args = parser.parse_args()
+
+    for filename in args.files:
+        path = build(filename)
+        print(f"{filename} -> {path} ({len(CompiledLexicon(path))} words)")
+
+
+if __name__ == "__main__":
+    main()
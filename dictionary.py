@@ -1,58 +1,70 @@
 """Module for the API."""
 
+import datetime
 import pathlib
 
 import random
 
-from akshara import varnakaarya as vk
+from instrumentation import timed
+from lexicon import get_lexicon
+from sampler import get_sampler
+from synonyms import get_synonym_graph
+
+
+DICTIONARY = "data/words.csv"
 
 
 def get_random(filename: pathlib.Path = "data/words.csv") -> str:
     """Return a word from amarakosha."""
 
-    with open(filename, "r", encoding="utf-8") as file:
-        words = file.readlines()[0]
-
-    word = random.choice(words.split(","))
+    word = random.choice(get_lexicon(filename).words)
     return word
 
 
+@timed("get_fixed_length")
 def get_fixed_length(length: int, filename: pathlib.Path = "data/words.csv") -> str:
     """Return a word from amarakosha with a fixed length."""
 
-    for _ in range(100):
-        res = get_random(filename)
+    return get_sampler(length, filename).next_word()
 
-        try:
-            akshaara = vk.get_akshara(res)
-        except AssertionError:
-            akshaara = []
 
-        if len(akshaara) == length:
-            return res
+def get_word_of_the_day(
+    length: int,
+    filename: pathlib.Path = "data/words.csv",
+    day: datetime.date | None = None,
+) -> str:
+    """Return the word of the day with a fixed length, shared by every session."""
 
-    return None
+    return get_sampler(length, filename).word_of_the_day(day)
 
 
+@timed("get_synonyms")
 def get_synonyms(word: str):
     """Return the synonyms of a word."""
 
-    with open("data/synonyms.csv", "r", encoding="utf-8") as file:
-        synonyms = file.readlines()
+    synonyms = get_synonym_graph().lookup(word)
 
-    for line in synonyms:
-        if word in line:
-            return {"synonyms": line.split(",")[2].split()}
+    if synonyms is not None:
+        return {"synonyms": synonyms}
 
     return {"error": "No synonyms found for the given word."}
 
 
-def is_word_in_dictionary(word: str):
-    """Check if the given word is in the dictionary."""
+def get_synonyms_batch(words: list[str]) -> dict[str, dict]:
+    """Return the synonyms of many words."""
+
+    return {
+        word: (
+            {"synonyms": synonyms}
+            if synonyms is not None
+            else {"error": "No synonyms found for the given word."}
+        )
+        for word, synonyms in get_synonym_graph().lookup_many(words).items()
+    }
 
-    with open("data/words.csv", "r", encoding="utf-8") as file:
-        lines = file.readlines()[0]
 
-    valid_words = lines.split(",")
+@timed("is_word_in_dictionary")
+def is_word_in_dictionary(word: str):
+    """Check if the given word is in the dictionary."""
 
-    return word in valid_words
+    return word in get_lexicon(DICTIONARY)
@@ -0,0 +1,196 @@
+"""Module to edit the word lists used by the game.
+
+The number of Aksharas of every word comes from the shared lexicon of the
+file, which is computed once per version of the file, and the histogram is
+then kept up to date as words are added and removed. Bulk imports split and
+check the candidate words in a process pool. Saves write a temporary file
+next to the list and rename it over the list, so a crash never leaves a half
+written list, and the game picks up the new version on its next lookup.
+"""
+
+import os
+import pathlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from dictionary import DICTIONARY
+from lexicon import count_aksharas, get_lexicon
+
+
+IMPORT_CHUNK = 500
+
+
+@dataclass
+class ImportReport:
+    """Class to represent the outcome of importing words into a list."""
+
+    added: list[str] = field(default_factory=list)
+    duplicates: list[str] = field(default_factory=list)
+    unknown: list[str] = field(default_factory=list)
+    wrong_length: list[str] = field(default_factory=list)
+    invalid: list[str] = field(default_factory=list)
+
+
+def _check(
+    words: list[str], dictionary: pathlib.Path | None
+) -> list[tuple[str, int, bool]]:
+    """Return the Akshara count and dictionary membership of some words."""
+
+    lexicon = get_lexicon(dictionary) if dictionary else None
+
+    return [
+        (word, count_aksharas(word), lexicon is None or word in lexicon)
+        for word in words
+    ]
+
+
+def atomic_write(path: pathlib.Path, text: str):
+    """Write a file through a temporary file renamed over it."""
+
+    path = pathlib.Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    with open(tmp, "w", encoding="utf-8") as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(tmp, path)
+
+
+@dataclass
+class WordListEditor:
+    """Class to add, remove, import and save the words of a list."""
+
+    filename: pathlib.Path
+    words: dict[str, int] = field(default_factory=dict)
+    histogram: Counter = field(default_factory=Counter)
+    added: list[str] = field(default_factory=list)
+
+    # Lists like amara.csv hold one entry per line, possibly several per word,
+    # and keep their other columns when saved.
+    lines: list[str] | None = None
+
+    @classmethod
+    def open(cls, filename: pathlib.Path) -> "WordListEditor":
+        """Open a word list for editing."""
+
+        lexicon = get_lexicon(filename)
+        counts = {
+            word: length for length, words in lexicon.buckets.items() for word in words
+        }
+        words = {word: counts.get(word, 0) for word in lexicon.words}
+
+        with open(filename, "r", encoding="utf-8") as file:
+            lines = file.read().splitlines()
+
+        return cls(
+            filename,
+            words,
+            Counter(words.values()),
+            lines=lines if len(lines) > 1 else None,
+        )
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.words
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _insert(self, word: str, length: int):
+        """Add a word whose Aksharas are already counted."""
+
+        self.words[word] = length
+        self.histogram[length] += 1
+        self.added.append(word)
+
+    def add(self, word: str) -> bool:
+        """Add a word, returning False if it is already in the list."""
+
+        if word in self.words:
+            return False
+
+        self._insert(word, count_aksharas(word))
+        return True
+
+    def remove(self, word: str) -> bool:
+        """Remove a word, returning False if it is not in the list."""
+
+        length = self.words.pop(word, None)
+        if length is None:
+            return False
+
+        self.histogram[length] -= 1
+        if not self.histogram[length]:
+            del self.histogram[length]
+        if word in self.added:
+            self.added.remove(word)
+
+        return True
+
+    def import_words(
+        self,
+        words: list[str],
+        dictionary: pathlib.Path | None = DICTIONARY,
+        length: int | None = None,
+        workers: int | None = None,
+    ) -> ImportReport:
+        """Add the words found in the dictionary with the right number of Aksharas.
+
+        The words are split and checked in a process pool when there are many.
+        """
+
+        report = ImportReport()
+
+        candidates = []
+        for word in dict.fromkeys(word.strip() for word in words):
+            if not word:
+                continue
+            if word in self.words:
+                report.duplicates.append(word)
+            else:
+                candidates.append(word)
+
+        chunks = [
+            candidates[start : start + IMPORT_CHUNK]
+            for start in range(0, len(candidates), IMPORT_CHUNK)
+        ]
+
+        if len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                checked = executor.map(_check, chunks, [dictionary] * len(chunks))
+                checked = [result for chunk in checked for result in chunk]
+        else:
+            checked = _check(candidates, dictionary)
+
+        for word, count, known in checked:
+            if not count:
+                report.invalid.append(word)
+            elif not known:
+                report.unknown.append(word)
+            elif length is not None and count != length:
+                report.wrong_length.append(word)
+            else:
+                self._insert(word, count)
+                report.added.append(word)
+
+        return report
+
+    def text(self) -> str:
+        """Return the contents of the file for the current words."""
+
+        if self.lines is None:
+            return ",".join(self.words)
+
+        kept = [line for line in self.lines if line.split(",")[0] in self.words]
+        present = {line.split(",")[0] for line in kept}
+        new = [word for word in self.words if word not in present]
+
+        return "\n".join(kept + new) + "\n"
+
+    def save(self):
+        """Write the list atomically."""
+
+        atomic_write(self.filename, self.text())
+        self.added = []
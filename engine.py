@@ -0,0 +1,193 @@
+"""Module to play the game without any user interface."""
+
+import pathlib
+import time
+from dataclasses import dataclass, field
+
+from akshara import varnakaarya as vk
+
+from candidates import CandidateIndex, get_candidate_index
+from dictionary import DICTIONARY, get_fixed_length
+from evaluate import CellStatus, score
+from game_state import GameState
+from instrumentation import count, observe, stage
+from validation import GuessValidator
+from word_processor import Word, get_word
+
+
+WORD_LENGTH = 3
+MAX_ATTEMPTS = 10
+WORD_LIST = "data/raamaayana.csv"
+
+
+@dataclass(frozen=True)
+class GuessOutcome:
+    """Class to represent the outcome of submitting a guess."""
+
+    valid: bool
+    message: str = ""
+    status: list[tuple[CellStatus, CellStatus]] | None = None
+    game_over: bool = False
+    suggestions: tuple[str, ...] = ()
+
+
+def parse_guess(guess: str) -> Word | None:
+    """Return the guess as a Word, or None if it is not in Devanagari."""
+
+    try:
+        with stage("get_akshara"):
+            vk.get_akshara(guess)
+    except AssertionError:
+        return None
+
+    with stage("word"):
+        return get_word(guess)
+
+
+@dataclass
+class GameSession:
+    """Class to play one game, from picking the word to the final score."""
+
+    state: GameState
+    word_list: pathlib.Path = WORD_LIST
+    dictionary: pathlib.Path = DICTIONARY
+
+    timings: dict[str, float] = field(init=False, repr=False, default_factory=dict)
+
+    _index: CandidateIndex | None = field(default=None, init=False, repr=False)
+    _candidates: int = field(default=0, init=False, repr=False)
+
+    def _build_index(self):
+        """Build the candidate index and replay the guesses so far.
+
+        The game keeps the index it started with, since its candidates are
+        rows of it, even if the word list is saved again in the meantime.
+        """
+
+        index = get_candidate_index(self.state.word_length, self.word_list)
+
+        candidates = index.all
+        for word, status in self.state.history():
+            candidates = index.narrow(candidates, word, status)
+
+        self._index, self._candidates = index, candidates
+
+    @property
+    def index(self) -> CandidateIndex:
+        """Return the candidate index of the game, built on first use."""
+
+        if self._index is None:
+            self._build_index()
+
+        return self._index
+
+    @property
+    def candidates(self) -> int:
+        """Return the bitset of the words still consistent with every guess."""
+
+        if self._index is None:
+            self._build_index()
+
+        return self._candidates
+
+    @classmethod
+    def new(
+        cls,
+        length: int = WORD_LENGTH,
+        max_attempts: int = MAX_ATTEMPTS,
+        word_list: pathlib.Path = WORD_LIST,
+        dictionary: pathlib.Path = DICTIONARY,
+    ) -> "GameSession":
+        """Start a game with a new secret word from the word list."""
+
+        secret = get_fixed_length(length, filename=word_list)
+        return cls(GameState(secret, length, max_attempts), word_list, dictionary)
+
+    @classmethod
+    def restore(
+        cls,
+        data: bytes,
+        word_list: pathlib.Path = WORD_LIST,
+        dictionary: pathlib.Path = DICTIONARY,
+    ) -> "GameSession":
+        """Resume a game from its serialized state."""
+        return cls(GameState.from_bytes(data), word_list, dictionary)
+
+    @property
+    def secret(self) -> Word:
+        """Return the secret word."""
+        return get_word(self.state.secret)
+
+    @property
+    def game_over(self) -> bool:
+        """Return whether the game is over."""
+        return self.state.game_over
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of words still consistent with every guess."""
+        return self.candidates.bit_count()
+
+    def validate(self, guess: Word):
+        """Return whether a guess can be played, with the reason if it cannot."""
+
+        validator = GuessValidator(self.state.word_length, self.dictionary)
+        return validator.validate(guess, self.state.previous_guesses)
+
+    def submit(
+        self, guess: Word, timings: dict[str, float] | None = None
+    ) -> GuessOutcome:
+        """Validate a guess and play it, adding up the time of every stage."""
+
+        if self.game_over:
+            return GuessOutcome(False, "The game is over.", game_over=True)
+
+        clock = time.perf_counter()
+
+        def lap(name: str):
+            nonlocal clock
+            now = time.perf_counter()
+            self.timings[name] = self.timings.get(name, 0.0) + now - clock
+            observe(f"submit.{name}", now - clock)
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + now - clock
+            clock = now
+
+        count("guesses")
+
+        result = self.validate(guess)
+        lap("validate")
+        if not result.valid:
+            return GuessOutcome(False, result.message, suggestions=result.suggestions)
+
+        status = list(score(self.secret, guess))
+        lap("score")
+
+        self.state.add_guess(guess.word, status)
+        self._candidates = self.index.narrow(self.candidates, guess.word, status)
+        lap("narrow")
+
+        return GuessOutcome(True, status=status, game_over=self.game_over)
+
+    def hint(self) -> tuple[str | None, int]:
+        """Return the suggested next guess and the number of words remaining."""
+
+        # Only a hint needs the solver, so it is not loaded before.
+        # pylint: disable-next=import-outside-toplevel
+        from solver import HINT_BUDGET, get_solver
+
+        start = time.perf_counter()
+        solver = get_solver(self.state.word_length, self.word_list)
+
+        # The words still possible are known already when the candidate index
+        # is over the same words, in the same order.
+        remaining = None
+        if self.index.lexicon.words is solver.words:
+            remaining = self.index.indices(self.candidates)
+
+        budget = max(HINT_BUDGET - (time.perf_counter() - start), 0.0)
+        return solver.suggest(self.state.history(), budget, remaining=remaining)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the game."""
+        return self.state.to_bytes()
@@ -1,9 +1,18 @@
 """Module to compare the word and guess Aksharas."""
 
+import argparse
+import itertools
+import pathlib
+import threading
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 
-from word_processor import Word, SVARAS
+import numpy as np
+
+from instrumentation import timed
+from lexicon import get_lexicon
+from word_processor import Word, SVARAS, get_word
 
 
 class CellStatus(Enum):
@@ -31,9 +40,9 @@ class Compare:
     def __post_init__(self):
 
         if isinstance(self.word, str):
-            self.word = Word(self.word)
+            self.word = get_word(self.word)
         if isinstance(self.guess, str):
-            self.guess = Word(self.guess)
+            self.guess = get_word(self.guess)
 
         if len(self.word.aksharas) != len(self.guess.aksharas):
             raise ValueError("Word and guess lengths do not match.")
@@ -42,6 +51,7 @@ class Compare:
             self.guess.aksharas
         )
 
+    @timed("compare")
     def compare(self):
         """Compare the word and guess Aksharas."""
 
@@ -107,9 +117,7 @@ class Compare:
 
         current_status_dict = {}
 
-        for index, akshara in enumerate(self.guess.aksharas):
-
-            vinyaasa = self.guess.fetch_vinyaasa(akshara)
+        for index, vinyaasa in enumerate(self.guess.vinyaasas):
 
             for v in vinyaasa:
 
@@ -140,7 +148,13 @@ class Compare:
 
                 while diff > 0:
 
-                    diff = self.reduce(key, index, diff)
+                    remaining = self.reduce(key, index, diff)
+
+                    # Nothing left to reduce, the other statuses are final.
+                    if remaining == diff:
+                        break
+
+                    diff = remaining
 
     def reduce(self, key, index, diff):
         """Reduce the status to MISSING if required."""
@@ -161,3 +175,360 @@ class Compare:
                     break
 
         return diff
+
+
+STATUSES = tuple(CellStatus)
+_CORRECT, _PRESENT, _ABSENT, _MISSING, _ = range(len(STATUSES))
+
+SCORE_CACHE_SIZE = 65536
+
+_varna_ids: dict[str, int] = {"-": 0}
+_varna_ids_lock = threading.Lock()
+
+
+def varna_id(varna: str) -> int:
+    """Return the process-wide integer id of a Varna."""
+
+    index = _varna_ids.get(varna)
+    if index is None:
+        with _varna_ids_lock:
+            index = _varna_ids.get(varna)
+            if index is None:
+                index = _varna_ids[varna] = len(_varna_ids)
+
+    return index
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedWord:
+    """Class to hold the integer encoding of a Word used for scoring."""
+
+    svaras: tuple[int, ...]
+    signatures: tuple[tuple[int, ...], ...]
+    svara_mask: int
+    vyanjana_masks: tuple[int, ...]
+    vyanjana_mask: int
+    counts: dict[int, int]
+    keys: tuple[tuple[int, int, tuple[int, ...], tuple[int, ...]], ...]
+
+
+@lru_cache(maxsize=SCORE_CACHE_SIZE)
+def encode(word: str) -> EncodedWord:
+    """Encode the Svaras and Vyanjanas of a word as integers and bitmasks."""
+
+    word = get_word(word)
+
+    svaras = tuple(varna_id(svara) for svara in word.svaras)
+    signatures = tuple(
+        tuple(varna_id(v) for v in signature)
+        for signature in word.get_vyanjana_signature()
+    )
+
+    vyanjana_masks = []
+    for vyanjanas in word.vyanjanas:
+        mask = 0
+        for vyanjana in vyanjanas:
+            mask |= 1 << varna_id(vyanjana)
+        vyanjana_masks.append(mask)
+
+    svara_mask = 0
+    for svara in svaras:
+        svara_mask |= 1 << svara
+
+    counts = {}
+    for v in itertools.chain(svaras, *signatures):
+        if v:
+            counts[v] = counts.get(v, 0) + 1
+
+    # For every Varna of the word as a guess, in order of first appearance:
+    # its id, the status it is reported in, the positions of each occurrence
+    # and the positions whose cell contains it.
+    occurrences = {}
+    for position, vinyaasa in enumerate(word.vinyaasas):
+        for v in vinyaasa:
+            index = 1 if v in SVARAS else 0
+            occurrences.setdefault((varna_id(v), index), []).append(position)
+
+    keys = tuple(
+        (key, index, tuple(positions), tuple(dict.fromkeys(positions)))
+        for (key, index), positions in occurrences.items()
+    )
+
+    return EncodedWord(
+        svaras,
+        signatures,
+        svara_mask,
+        tuple(vyanjana_masks),
+        _or(vyanjana_masks),
+        counts,
+        keys,
+    )
+
+
+def _or(masks: list[int]) -> int:
+    """Return the union of bitmasks."""
+
+    union = 0
+    for mask in masks:
+        union |= mask
+
+    return union
+
+
+@lru_cache(maxsize=SCORE_CACHE_SIZE)
+def _score(word: str, guess: str) -> tuple[tuple[CellStatus, CellStatus], ...]:
+    """Score a guess against a word given as strings."""
+
+    w = encode(word)
+    g = encode(guess)
+
+    length = len(w.svaras)
+    if length != len(g.svaras):
+        raise ValueError("Word and guess lengths do not match.")
+
+    status = [[_ABSENT, _ABSENT] for _ in range(length)]
+
+    for ii in range(length):
+
+        if g.svaras[ii] == w.svaras[ii]:
+            status[ii][1] = _CORRECT
+        elif (1 << g.svaras[ii]) & w.svara_mask:
+            status[ii][1] = _PRESENT
+
+        if g.signatures[ii] == w.signatures[ii]:
+            status[ii][0] = _CORRECT
+        elif g.vyanjana_masks[ii] & w.vyanjana_masks[ii]:
+            status[ii][0] = _MISSING
+        elif g.vyanjana_masks[ii] & w.vyanjana_mask:
+            status[ii][0] = _PRESENT
+
+    # Same rules as Compare.degrade, with the counts taken before any change.
+    values = [
+        sum(status[position][index] != _ABSENT for position in positions)
+        for _, index, positions, _ in g.keys
+    ]
+
+    for (key, index, _, cells), value in zip(g.keys, values):
+
+        diff = value - w.counts.get(key, value)
+
+        for position in cells:
+            if diff <= 0:
+                break
+            if status[position][index] == _PRESENT:
+                status[position][index] = _ABSENT
+                diff -= 1
+
+    return tuple((STATUSES[v], STATUSES[s]) for v, s in status)
+
+
+@timed("score")
+def score(
+    word: Word | str, guess: Word | str
+) -> tuple[tuple[CellStatus, CellStatus], ...]:
+    """Return the same statuses as Compare.compare, cached across sessions."""
+
+    if isinstance(word, Word):
+        word = word.word
+    if isinstance(guess, Word):
+        guess = guess.word
+
+    return _score(word, guess)
+
+
+def pack_status(status: list[tuple[CellStatus, CellStatus]]) -> int:
+    """Pack the statuses of a guess into a single integer feedback code."""
+
+    code = 0
+    for vyanjana_status, svara_status in reversed(status):
+        code = code * 25 + STATUSES.index(vyanjana_status) * 5
+        code += STATUSES.index(svara_status)
+
+    return code
+
+
+def unpack_code(code: int, length: int) -> list[tuple[CellStatus, CellStatus]]:
+    """Unpack an integer feedback code into the statuses of a guess."""
+
+    status = []
+    for _ in range(length):
+        code, cell = divmod(int(code), 25)
+        status.append((STATUSES[cell // 5], STATUSES[cell % 5]))
+
+    return status
+
+
+def code_dtype(length: int) -> np.dtype:
+    """Return the smallest unsigned dtype holding the feedback codes of a length."""
+
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if 25**length <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+
+    raise ValueError(f"Words with {length} Aksharas cannot be packed.")
+
+
+@dataclass(frozen=True)
+class EncodedLexicon:
+    """Class to hold a list of words of one length as integer matrices.
+
+    `svaras` has one Svara id per Akshara position and `signatures` has the
+    Vyanjana signature of every position, padded with -1.
+    """
+
+    words: tuple[str, ...]
+    svaras: np.ndarray
+    signatures: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def length(self) -> int:
+        """Return the number of Aksharas of the words."""
+        return self.svaras.shape[1]
+
+    def subset(self, indices: np.ndarray) -> "EncodedLexicon":
+        """Return the lexicon restricted to some of its words."""
+
+        return EncodedLexicon(
+            tuple(self.words[i] for i in indices),
+            self.svaras[indices],
+            self.signatures[indices],
+        )
+
+
+def encode_lexicon(words: list[str]) -> EncodedLexicon:
+    """Encode words having the same number of Aksharas for batch scoring."""
+
+    words = tuple(words)
+    encoded = [encode(word) for word in words]
+
+    lengths = {len(e.svaras) for e in encoded}
+    if len(lengths) > 1:
+        raise ValueError("All the words must have the same number of Aksharas.")
+
+    length = lengths.pop() if lengths else 0
+    width = max((len(sig) for e in encoded for sig in e.signatures), default=1)
+
+    svaras = np.array([e.svaras for e in encoded], dtype=np.int16)
+    svaras = svaras.reshape(len(words), length)
+    signatures = np.full((len(words), length, width), -1, dtype=np.int16)
+
+    for row, e in enumerate(encoded):
+        for position, signature in enumerate(e.signatures):
+            signatures[row, position, : len(signature)] = signature
+
+    return EncodedLexicon(words, svaras, signatures)
+
+
+def batch_score(guess: Word | str, lexicon: EncodedLexicon) -> np.ndarray:
+    """Score one guess against every word of a lexicon.
+
+    Returns the packed feedback codes (see `pack_status`) that `score` gives
+    for each word of the lexicon as the secret.
+    """
+
+    if isinstance(guess, Word):
+        guess = guess.word
+
+    g = encode(guess)
+    length = lexicon.length
+
+    if len(g.svaras) != length:
+        raise ValueError("Word and guess lengths do not match.")
+
+    count = len(lexicon)
+    width = lexicon.signatures.shape[2]
+
+    svara_status = np.full((count, length), _ABSENT, dtype=np.uint8)
+    vyanjana_status = np.full((count, length), _ABSENT, dtype=np.uint8)
+
+    for ii in range(length):
+
+        svara = g.svaras[ii]
+        svara_status[:, ii] = np.where(
+            lexicon.svaras[:, ii] == svara,
+            _CORRECT,
+            np.where((lexicon.svaras == svara).any(axis=1), _PRESENT, _ABSENT),
+        )
+
+        signature = g.signatures[ii]
+        if len(signature) <= width:
+            padded = np.full(width, -1, dtype=np.int16)
+            padded[: len(signature)] = signature
+            correct = (lexicon.signatures[:, ii, :] == padded).all(axis=1)
+        else:
+            correct = np.zeros(count, dtype=bool)
+
+        vyanjanas = [v for v in signature if v]
+        missing = np.isin(lexicon.signatures[:, ii, :], vyanjanas).any(axis=1)
+        present = np.isin(lexicon.signatures, vyanjanas).any(axis=(1, 2))
+
+        vyanjana_status[:, ii] = np.select(
+            [correct, missing, present], [_CORRECT, _MISSING, _PRESENT], _ABSENT
+        )
+
+    statuses = (vyanjana_status, svara_status)
+
+    values = [
+        sum(
+            (statuses[index][:, position] != _ABSENT).astype(np.int16)
+            for position in positions
+        )
+        for _, index, positions, _ in g.keys
+    ]
+
+    for (key, index, _, cells), value in zip(g.keys, values):
+
+        counts = (lexicon.svaras == key).sum(axis=1) + (lexicon.signatures == key).sum(
+            axis=(1, 2)
+        )
+        diff = np.where(counts > 0, value - counts, 0)
+
+        status = statuses[index]
+        for position in cells:
+            reduce = (status[:, position] == _PRESENT) & (diff > 0)
+            status[reduce, position] = _ABSENT
+            diff -= reduce
+
+    dtype = code_dtype(length)
+    cells = vyanjana_status.astype(dtype) * 5 + svara_status
+    weights = (25 ** np.arange(length)).astype(dtype)
+
+    return (cells * weights).sum(axis=1, dtype=dtype)
+
+
+def verify_score(filename: pathlib.Path, length: int) -> list[tuple[str, str]]:
+    """Return every pair of words of a list where score and Compare disagree."""
+
+    words = get_lexicon(filename).bucket(length)
+    mismatches = []
+
+    for word, guess in itertools.product(words, repeat=2):
+        compare = Compare(word, guess)
+        compare.compare()
+        if tuple(compare.status) != score(word, guess):
+            mismatches.append((word, guess))
+
+    return mismatches
+
+
+def main():
+    """Check the fast scoring path against Compare over a word list."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("filename", type=pathlib.Path)
+    parser.add_argument("length", type=int)
+    args = parser.parse_args()
+
+    mismatches = verify_score(args.filename, args.length)
+    for word, guess in mismatches:
+        print(f"{word} {guess}")
+
+    print(f"{len(mismatches)} mismatches")
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Module to precompute the feedback code of every guess against every secret.
+
+Row `g` and column `s` of the matrix hold `batch_score(words[g], ...)[s]`, the
+packed feedback for guessing `words[g]` when the secret is `words[s]`. The
+words are those of `get_lexicon(filename).bucket(length)`, in that order.
+The file is keyed on the contents of the list and on VERSION, and a matrix
+whose shape or dtype does not fit the words of the list is built again.
+
+Build a matrix with `python feedback_matrix.py data/raamaayana.csv 3`.
+"""
+
+import argparse
+import os
+import pathlib
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from evaluate import EncodedLexicon, batch_score, code_dtype, encode_lexicon
+from lexicon import cache_path, get_lexicon
+
+
+CHUNK_SIZE = 64
+
+# Raised whenever the scoring or the packing of the codes changes.
+VERSION = 1
+
+_lexicon: EncodedLexicon | None = None
+
+
+def matrix_path(filename: pathlib.Path, length: int) -> pathlib.Path:
+    """Return the path of the matrix for the current contents of a word list."""
+    return cache_path(filename, f"{length}.v{VERSION}.npy")
+
+
+def _init_worker(words: tuple[str, ...]):
+    """Encode the lexicon once in every worker process."""
+
+    global _lexicon
+    _lexicon = encode_lexicon(words)
+
+
+def _fill_rows(path: pathlib.Path, start: int, stop: int) -> int:
+    """Score a range of guesses and write their rows into the matrix file."""
+
+    matrix = np.load(path, mmap_mode="r+")
+    for row in range(start, stop):
+        matrix[row] = batch_score(_lexicon.words[row], _lexicon)
+    matrix.flush()
+
+    return stop - start
+
+
+def build(
+    filename: pathlib.Path, length: int, workers: int | None = None
+) -> pathlib.Path:
+    """Build the feedback matrix of a word list across a pool of processes."""
+
+    words = get_lexicon(filename).bucket(length)
+    path = matrix_path(filename, length)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+    matrix = np.lib.format.open_memmap(
+        tmp, mode="w+", dtype=code_dtype(length), shape=(len(words), len(words))
+    )
+    del matrix
+
+    chunks = [
+        (start, min(start + CHUNK_SIZE, len(words)))
+        for start in range(0, len(words), CHUNK_SIZE)
+    ]
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(words,)
+    ) as executor:
+        futures = [executor.submit(_fill_rows, tmp, *chunk) for chunk in chunks]
+        for future in futures:
+            future.result()
+
+    tmp.replace(path)
+
+    return path
+
+
+_matrices: dict[pathlib.Path, np.ndarray] = {}
+_matrices_lock = threading.Lock()
+
+
+def _fits(matrix: np.ndarray, size: int, length: int) -> bool:
+    """Return whether a matrix holds the codes of a list of some size."""
+    return matrix.shape == (size, size) and matrix.dtype == code_dtype(length)
+
+
+def load(filename: pathlib.Path, length: int) -> np.ndarray | None:
+    """Return the memory-mapped matrix of a word list, or None if not built.
+
+    The path carries a hash of the word list, so a matrix built from an older
+    version of the list is never returned, and one that does not fit the
+    current words, written by an older version of this module or cut short,
+    is built again.
+    """
+
+    size = len(get_lexicon(filename).bucket(length))
+    path = matrix_path(filename, length)
+
+    matrix = _matrices.get(path)
+    if (matrix is None or not _fits(matrix, size, length)) and path.exists():
+        with _matrices_lock:
+            matrix = _matrices.get(path)
+            if matrix is None or not _fits(matrix, size, length):
+                try:
+                    matrix = np.load(path, mmap_mode="r")
+                except ValueError:
+                    matrix = None
+                if matrix is None or not _fits(matrix, size, length):
+                    matrix = np.load(build(filename, length), mmap_mode="r")
+                _matrices[path] = matrix
+
+    return matrix
+
+
+def main():
+    """Build the feedback matrix of a word list."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("filename", type=pathlib.Path)
+    parser.add_argument("length", type=int)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = build(args.filename, args.length, args.workers)
+    elapsed = time.perf_counter() - start
+
+    matrix = load(args.filename, args.length)
+    print(
+        f"{path}: {matrix.shape[0]} x {matrix.shape[1]} {matrix.dtype} "
+        f"in {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Module to hold the state of a game in a compact, serializable form."""
+
+import struct
+import time
+from array import array
+
+from evaluate import STATUSES, CellStatus
+from word_processor import get_word
+
+
+VERSION = 2
+HEADER = struct.Struct("<BBBB?IH")
+
+# Every status fits in three bits, so a cell takes six and a row of up to ten
+# Aksharas fits in one unsigned 64-bit integer.
+STATUS_BITS = 3
+CELL_BITS = 2 * STATUS_BITS
+STATUS_MASK = (1 << STATUS_BITS) - 1
+
+
+def pack_row(status: list[tuple[CellStatus, CellStatus]]) -> int:
+    """Pack the statuses of a guess into 3 bits per status."""
+
+    packed = 0
+    for index, (vyanjana_status, svara_status) in enumerate(status):
+        cell = STATUSES.index(vyanjana_status)
+        cell |= STATUSES.index(svara_status) << STATUS_BITS
+        packed |= cell << (CELL_BITS * index)
+
+    return packed
+
+
+def unpack_row(packed: int, length: int) -> list[tuple[CellStatus, CellStatus]]:
+    """Unpack the statuses of a guess packed by `pack_row`."""
+
+    status = []
+    for index in range(length):
+        cell = packed >> (CELL_BITS * index)
+        status.append(
+            (
+                STATUSES[cell & STATUS_MASK],
+                STATUSES[(cell >> STATUS_BITS) & STATUS_MASK],
+            )
+        )
+
+    return status
+
+
+class GameState:
+    """Class to hold the secret word, the guesses and their statuses."""
+
+    __slots__ = (
+        "secret",
+        "word_length",
+        "max_attempts",
+        "guesses",
+        "statuses",
+        "game_over",
+        "started",
+    )
+
+    def __init__(self, secret: str, word_length: int, max_attempts: int):
+
+        self.secret = secret
+        self.word_length = word_length
+        self.max_attempts = max_attempts
+
+        self.guesses: list[str] = []
+        self.statuses = array("Q")
+        self.game_over = False
+        self.started = int(time.time())
+
+    @property
+    def current_row(self) -> int:
+        """Return the number of guesses played so far."""
+        return len(self.guesses)
+
+    @property
+    def won(self) -> bool:
+        """Return whether the last guess was the secret word."""
+        return bool(self.guesses) and self.guesses[-1] == self.secret
+
+    @property
+    def score(self) -> int:
+        """Return the score, the number of attempts left when the word was found."""
+        return self.max_attempts - self.current_row + 1 if self.won else 0
+
+    @property
+    def previous_guesses(self) -> set[str]:
+        """Return the words guessed so far."""
+        return set(self.guesses)
+
+    def add_guess(self, guess: str, status: list[tuple[CellStatus, CellStatus]]):
+        """Record a guess with its statuses and end the game if it is over."""
+
+        self.guesses.append(guess)
+        self.statuses.append(pack_row(status))
+
+        if self.won or self.current_row == self.max_attempts:
+            self.game_over = True
+
+    def status(self, row: int) -> list[tuple[CellStatus, CellStatus]]:
+        """Return the statuses of a guess."""
+        return unpack_row(self.statuses[row], self.word_length)
+
+    def history(self) -> list[tuple[str, list[tuple[CellStatus, CellStatus]]]]:
+        """Return every guess so far with its statuses."""
+        return [(guess, self.status(row)) for row, guess in enumerate(self.guesses)]
+
+    def grid(
+        self,
+    ) -> tuple[list[list[str]], list[list[tuple[CellStatus, CellStatus]]]]:
+        """Return the Aksharas and statuses of every row, blank rows included."""
+
+        blank = [(CellStatus.ABSENT, CellStatus.ABSENT)] * self.word_length
+
+        guesses = [get_word(guess).aksharas for guess in self.guesses]
+        statuses = [self.status(row) for row in range(self.current_row)]
+
+        for _ in range(self.max_attempts - self.current_row):
+            guesses.append([""] * self.word_length)
+            statuses.append(blank)
+
+        return guesses, statuses
+
+    def to_bytes(self) -> bytes:
+        """Serialize the state."""
+
+        secret = self.secret.encode("utf-8")
+        guesses = ",".join(self.guesses).encode("utf-8")
+        row_size = (CELL_BITS * self.word_length + 7) // 8
+
+        return b"".join(
+            [
+                HEADER.pack(
+                    VERSION,
+                    self.word_length,
+                    self.max_attempts,
+                    self.current_row,
+                    self.game_over,
+                    self.started,
+                    len(secret),
+                ),
+                secret,
+                guesses,
+                b"".join(row.to_bytes(row_size, "little") for row in self.statuses),
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GameState":
+        """Deserialize a state written by `to_bytes`."""
+
+        version, word_length, max_attempts, rows, game_over, started, secret_size = (
+            HEADER.unpack_from(data)
+        )
+        if version != VERSION:
+            raise ValueError(f"Unsupported game state version {version}.")
+
+        row_size = (CELL_BITS * word_length + 7) // 8
+        start = HEADER.size + secret_size
+        end = len(data) - rows * row_size
+
+        state = cls(
+            data[HEADER.size : start].decode("utf-8"), word_length, max_attempts
+        )
+        state.game_over = game_over
+        state.started = started
+
+        if rows:
+            state.guesses = data[start:end].decode("utf-8").split(",")
+            state.statuses = array(
+                "Q",
+                (
+                    int.from_bytes(data[offset : offset + row_size], "little")
+                    for offset in range(end, len(data), row_size)
+                ),
+            )
+
+        return state
@@ -1,7 +1,10 @@
 """This module contains the functions to render the grid of Aksharas."""
 
+from functools import lru_cache
+
 import streamlit as st
 from evaluate import CellStatus
+from game_state import GameState
 
 
 cell_colors_dict = {
@@ -13,6 +16,7 @@ cell_colors_dict = {
 }
 
 
+@lru_cache(maxsize=None)
 def grid_cell_markdown(akshara: str, status: CellStatus) -> str:
     """Return the HTML for a grid cell."""
 
@@ -21,27 +25,36 @@ def grid_cell_markdown(akshara: str, status: CellStatus) -> str:
     return f"<div style='text-align: center; background: linear-gradient(90deg, {cell_color_1} 50%, {cell_color_2} 50%); color: white; height: 50px; line-height: 50px; margin-bottom: 10px;'>{akshara}</div>"
 
 
+@lru_cache(maxsize=4096)
+def grid_row_markdown(
+    aksharas: tuple[str, ...], statuses: tuple[tuple[CellStatus, CellStatus], ...]
+) -> str:
+    """Return the HTML for a row of grid cells."""
+
+    cells = "".join(
+        grid_cell_markdown(akshara, status)
+        for akshara, status in zip(aksharas, statuses)
+    )
+    return f"<div style='display: grid; grid-template-columns: repeat({len(aksharas)}, 1fr); column-gap: 8px;'>{cells}</div>"
+
+
 # Render the Grid
-def render_grid(word_length: int, max_attempts: int, helper_text: list):
-    """Render the grid of Aksharas."""
+def render_grid(game: GameState, helper_text: list):
+    """Render the grid of Aksharas as a single HTML block.
 
-    col_widths = [2 / word_length for _ in range(word_length)]
-    col_widths.append(0.1)
-    col_widths.append(4)
+    Rows are memoized by their Aksharas and statuses, so only the rows that
+    changed since the last rerun are built again.
+    """
 
+    col_widths = [2, 0.1, 4]
     col_widths = [width / sum(col_widths) for width in col_widths]
 
-    for row in range(max_attempts):
-        cols = st.columns(spec=col_widths, gap="small")
-        for col_idx, col in enumerate(cols):
-
-            if col_idx < word_length:
-                akshara = st.session_state.guesses[row][col_idx]
-                status = st.session_state.guess_status[row][col_idx]
-                col.markdown(
-                    grid_cell_markdown(akshara, status), unsafe_allow_html=True
-                )
+    guesses, statuses = game.grid()
+    rows = "".join(
+        grid_row_markdown(tuple(aksharas), tuple(status))
+        for aksharas, status in zip(guesses, statuses)
+    )
 
-            elif col_idx == word_length + 1:
-                if row < len(helper_text):
-                    col.markdown(helper_text[row], unsafe_allow_html=True)
+    grid_col, _, helper_col = st.columns(spec=col_widths, gap="small")
+    grid_col.markdown(rows, unsafe_allow_html=True)
+    helper_col.markdown("\n\n".join(helper_text), unsafe_allow_html=True)
@@ -0,0 +1,222 @@
+"""Module to build game word lists from the source texts.
+
+Every source is streamed line by line and turned into words with a reference:
+
+    single-line lists   the comma separated words, referenced by the file name
+    synonyms.csv        the members of every group once, by group
+    other sources       the words of the first column, by the last column
+
+Words are deduplicated as they stream, and only the new ones are sent in
+chunks to a process pool to be split into Aksharas. The words kept are
+written in one game list per Akshara count, with a metadata file holding the
+frequency and the first references of every word.
+
+    python ingest.py data/shlokas.csv data/amara.csv --lengths 3 4 --out words
+"""
+
+import argparse
+import pathlib
+import time
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from editor import atomic_write
+from lexicon import count_aksharas, get_lexicon
+from verse_index import NON_LETTERS
+
+
+CHUNK_SIZE = 2000
+MAX_REFERENCES = 5
+
+
+def _is_single_line(filename: pathlib.Path) -> bool:
+    """Return whether a file holds a single line."""
+
+    with open(filename, "r", encoding="utf-8") as file:
+        file.readline()
+        return not file.readline()
+
+
+def read_source(filename: pathlib.Path) -> Iterator[tuple[str, str]]:
+    """Yield the words of a source with their reference, one line at a time."""
+
+    filename = pathlib.Path(filename)
+
+    if _is_single_line(filename):
+        with open(filename, "r", encoding="utf-8") as file:
+            for word in file.readline().strip().split(","):
+                yield word, filename.stem
+        return
+
+    # synonyms.csv repeats the members of a group on the line of every
+    # headword of it, so a group is read once, keyed like SynonymGraph does.
+    groups = set()
+
+    with open(filename, "r", encoding="utf-8") as file:
+        for line in file:
+
+            columns = line.rstrip("\n").split(",")
+
+            if filename.stem == "synonyms" and len(columns) >= 3:
+                headword, group, words = columns[0], columns[1], ",".join(columns[2:])
+                members = words.split()
+                if headword not in members:
+                    yield headword, group
+                if (group, words) not in groups:
+                    groups.add((group, words))
+                    for word in dict.fromkeys(members):
+                        yield word, group
+                continue
+
+            reference = columns[-1] if len(columns) > 1 else filename.stem
+            for word in NON_LETTERS.split(columns[0]):
+                yield word, reference
+
+
+def _segment(words: list[str]) -> list[tuple[str, int]]:
+    """Return the number of Aksharas of some words."""
+    return [(word, count_aksharas(word)) for word in words]
+
+
+@dataclass
+class Corpus:
+    """Class to hold the words of the sources with their frequency and references."""
+
+    frequency: Counter = field(default_factory=Counter)
+    references: dict[str, list[str]] = field(default_factory=dict)
+    lengths: dict[str, int] = field(default_factory=dict)
+
+    def add(self, word: str, reference: str) -> bool:
+        """Count one occurrence of a word, returning whether it is new."""
+
+        self.frequency[word] += 1
+
+        references = self.references.get(word)
+        if references is None:
+            self.references[word] = [reference]
+            return True
+
+        if len(references) < MAX_REFERENCES and reference not in references:
+            references.append(reference)
+
+        return False
+
+    def buckets(
+        self,
+        lengths: set[int] | None = None,
+        dictionary: pathlib.Path | None = None,
+        min_frequency: int = 1,
+    ) -> dict[int, list[str]]:
+        """Return the words kept, grouped by Akshara count, most frequent first."""
+
+        lexicon = get_lexicon(dictionary) if dictionary else None
+
+        buckets: dict[int, list[str]] = {}
+        for word, count in self.frequency.most_common():
+
+            length = self.lengths.get(word, 0)
+            if not length or count < min_frequency:
+                continue
+            if lengths and length not in lengths:
+                continue
+            if lexicon is not None and word not in lexicon:
+                continue
+
+            buckets.setdefault(length, []).append(word)
+
+        return buckets
+
+
+def ingest(
+    sources: list[pathlib.Path], workers: int | None = None
+) -> tuple[Corpus, int]:
+    """Stream the sources into a corpus, splitting new words across a pool."""
+
+    corpus = Corpus()
+    tokens = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        futures = []
+        pending: list[str] = []
+
+        for source in sources:
+            for word, reference in read_source(source):
+                if not word:
+                    continue
+                tokens += 1
+                if corpus.add(word, reference):
+                    pending.append(word)
+                if len(pending) == CHUNK_SIZE:
+                    futures.append(executor.submit(_segment, pending))
+                    pending = []
+
+        if pending:
+            futures.append(executor.submit(_segment, pending))
+
+        for future in futures:
+            corpus.lengths.update(future.result())
+
+    return corpus, tokens
+
+
+def write_lists(
+    corpus: Corpus, buckets: dict[int, list[str]], out: pathlib.Path, name: str
+) -> list[pathlib.Path]:
+    """Write a game list and a metadata file for every Akshara count."""
+
+    out.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    for length, words in sorted(buckets.items()):
+
+        path = out / f"{name}-{length}.csv"
+        atomic_write(path, ",".join(words))
+
+        meta = out / f"{name}-{length}.meta.csv"
+        atomic_write(
+            meta,
+            "".join(
+                f"{word},{corpus.frequency[word]},{' '.join(corpus.references[word])}\n"
+                for word in words
+            ),
+        )
+
+        written.extend([path, meta])
+
+    return written
+
+
+def main():
+    """Build length-bucketed game word lists from the source texts."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("sources", nargs="+", type=pathlib.Path)
+    parser.add_argument("--out", type=pathlib.Path, default=pathlib.Path("words"))
+    parser.add_argument("--name", default="corpus")
+    parser.add_argument("--lengths", type=int, nargs="*")
+    parser.add_argument("--dictionary", type=pathlib.Path)
+    parser.add_argument("--min-frequency", type=int, default=1)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    corpus, tokens = ingest(args.sources, args.workers)
+    buckets = corpus.buckets(
+        set(args.lengths or ()), args.dictionary, args.min_frequency
+    )
+    write_lists(corpus, buckets, args.out, args.name)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{tokens} words, {len(corpus.frequency)} distinct, "
+        f"{sum(len(words) for words in buckets.values())} kept in {elapsed:.2f}s"
+    )
+    for length, words in sorted(buckets.items()):
+        print(f"  {length} aksharas: {len(words)} words")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Module to time the stages of the game and count events, when asked to.
+
+Set WORDLE_INSTRUMENT=1 to turn it on. Otherwise `timed` returns the function
+it decorates unchanged and `stage` returns a shared no-op context, so the
+instrumented code runs as if it was not instrumented.
+
+Stage timings go into histograms shared by every session of the process, and
+are written after every rerun, at most every WRITE_INTERVAL seconds, to a
+Prometheus text file (WORDLE_METRICS_FILE). With WORDLE_PROFILE_SLOWEST=N
+every rerun is profiled and the profiles of the N slowest are kept in
+WORDLE_PROFILE_DIR, to be read with `python -m pstats`.
+"""
+
+import bisect
+import contextlib
+import cProfile
+import functools
+import heapq
+import os
+import pathlib
+import threading
+import time
+
+
+ENABLED = os.environ.get("WORDLE_INSTRUMENT", "") not in ("", "0")
+METRICS_FILE = pathlib.Path(
+    os.environ.get("WORDLE_METRICS_FILE", "metrics/wordle.prom")
+)
+PROFILE_SLOWEST = int(os.environ.get("WORDLE_PROFILE_SLOWEST", "0"))
+PROFILE_DIR = pathlib.Path(os.environ.get("WORDLE_PROFILE_DIR", "metrics/profiles"))
+WRITE_INTERVAL = 5.0
+
+# Upper bounds of the histogram buckets, in seconds.
+BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+class Histogram:
+    """Class to count the durations of a stage in fixed buckets."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        """Add a duration."""
+
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+_histograms: dict[str, Histogram] = {}
+_counters: dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def observe(name: str, seconds: float):
+    """Add the duration of a stage to its histogram."""
+
+    if not ENABLED:
+        return
+
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+def count(name: str, value: int = 1):
+    """Add to a counter."""
+
+    if not ENABLED:
+        return
+
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+class _Stage:
+    """Class to time a block of code as a stage."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+def stage(name: str):
+    """Return a context timing a block of code, or a no-op one if disabled."""
+    return _Stage(name) if ENABLED else _NO_STAGE
+
+
+def timed(name: str):
+    """Return a decorator timing every call of a function as a stage."""
+
+    def decorator(function):
+
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def render() -> str:
+    """Return the histograms and counters in the Prometheus text format."""
+
+    with _lock:
+        histograms = {
+            name: (list(h.counts), h.total, h.count) for name, h in _histograms.items()
+        }
+        counters = dict(_counters)
+
+    lines = [
+        "# HELP wordle_stage_seconds Time spent in each stage of the game.",
+        "# TYPE wordle_stage_seconds histogram",
+    ]
+    for name, (counts, total, observed) in sorted(histograms.items()):
+        cumulative = 0
+        for bound, bucket in zip((*BUCKETS, "+Inf"), counts):
+            cumulative += bucket
+            lines.append(
+                f'wordle_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}'
+            )
+        lines.append(f'wordle_stage_seconds_sum{{stage="{name}"}} {total}')
+        lines.append(f'wordle_stage_seconds_count{{stage="{name}"}} {observed}')
+
+    lines.append("# HELP wordle_events_total Events counted by the game.")
+    lines.append("# TYPE wordle_events_total counter")
+    for name, value in sorted(counters.items()):
+        lines.append(f'wordle_events_total{{event="{name}"}} {value}')
+
+    return "\n".join(lines) + "\n"
+
+
+_last_write = 0.0
+
+
+def write(path: pathlib.Path = METRICS_FILE, force: bool = False):
+    """Write the metrics file, at most every WRITE_INTERVAL seconds."""
+
+    global _last_write
+
+    now = time.monotonic()
+    if not ENABLED or (not force and now - _last_write < WRITE_INTERVAL):
+        return
+    _last_write = now
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(render(), encoding="utf-8")
+    tmp.replace(path)
+
+
+# The profiles kept so far, as a heap of (seconds, path) with the fastest first.
+_profiles: list[tuple[float, str]] = []
+
+
+def _keep_profile(profile: cProfile.Profile, seconds: float):
+    """Save the profile of a rerun if it is among the slowest ones."""
+
+    with _lock:
+        if len(_profiles) >= PROFILE_SLOWEST and seconds <= _profiles[0][0]:
+            return
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"rerun-{seconds * 1000:.0f}ms-{time.time_ns()}.prof"
+        profile.dump_stats(path)
+
+        heapq.heappush(_profiles, (seconds, str(path)))
+        if len(_profiles) > PROFILE_SLOWEST:
+            _, fastest = heapq.heappop(_profiles)
+            pathlib.Path(fastest).unlink(missing_ok=True)
+
+
+_current = threading.local()
+
+
+def start_rerun():
+    """Start timing a rerun of the app, profiling it if asked."""
+
+    if not ENABLED:
+        return
+
+    # A rerun interrupted by an exception never finished, so drop it.
+    previous = getattr(_current, "profile", None)
+    if previous is not None:
+        previous.disable()
+
+    profile = cProfile.Profile() if PROFILE_SLOWEST else None
+    if profile is not None:
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already running on this thread.
+            profile = None
+
+    _current.profile = profile
+    _current.start = time.perf_counter()
+
+
+def finish_rerun():
+    """Record the rerun started last, keep its profile if slow and write the metrics.
+
+    Call it before st.rerun and at the end of the script.
+    """
+
+    start = getattr(_current, "start", None)
+    if not ENABLED or start is None:
+        return
+
+    profile = _current.profile
+    if profile is not None:
+        profile.disable()
+    seconds = time.perf_counter() - start
+    _current.profile = _current.start = None
+
+    observe("rerun", seconds)
+    count("reruns")
+    if profile is not None:
+        _keep_profile(profile, seconds)
+    write()
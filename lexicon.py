@@ -0,0 +1,152 @@
+"""Module to load the word lists once and share them across sessions."""
+
+import hashlib
+import os
+import pathlib
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from akshara import varnakaarya as vk
+
+
+CACHE_DIR = pathlib.Path("cache")
+
+# Raised whenever read_words parses a source differently, so the artifacts
+# built from the words it read before are never found again.
+READER_VERSION = 2
+
+
+def source_digest(filename: pathlib.Path) -> str:
+    """Return a short hash of the contents of a source file."""
+
+    with open(filename, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()[:16]
+
+
+def cache_path(filename: pathlib.Path, suffix: str) -> pathlib.Path:
+    """Return the path of an artifact derived from the current source file."""
+
+    stem = pathlib.Path(filename).stem
+    digest = source_digest(filename)
+    return CACHE_DIR / f"{stem}-{digest}-r{READER_VERSION}.{suffix}"
+
+
+def read_words(filename: pathlib.Path) -> list[str]:
+    """Read a word list from a file.
+
+    Curated lists hold all the words comma separated on a single line, while
+    lists like amara.csv hold one entry per line with the word first.
+    """
+
+    with open(filename, "r", encoding="utf-8") as file:
+        lines = file.read().splitlines()
+
+    if len(lines) == 1:
+        return lines[0].split(",")
+
+    return [line.split(",")[0] for line in lines if line]
+
+
+def count_aksharas(word: str) -> int:
+    """Return the number of Aksharas in a word, or 0 if it cannot be split."""
+
+    try:
+        return len(vk.get_akshara(word))
+    except AssertionError:
+        return 0
+
+
+@dataclass
+class Lexicon:
+    """Class to hold a word list with a hash index and length buckets."""
+
+    filename: str
+    words: tuple[str, ...]
+    mtime: int = 0
+    index: frozenset[str] = field(init=False)
+
+    _buckets: dict[int, tuple[str, ...]] = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self.index = frozenset(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.index
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def buckets(self) -> dict[int, tuple[str, ...]]:
+        """Return the words grouped by their number of Aksharas."""
+
+        if self._buckets is None:
+            with self._lock:
+                if self._buckets is None:
+                    buckets = {}
+                    for word in dict.fromkeys(self.words):
+                        buckets.setdefault(count_aksharas(word), []).append(word)
+                    buckets.pop(0, None)
+                    self._buckets = {
+                        length: tuple(words) for length, words in buckets.items()
+                    }
+
+        return self._buckets
+
+    def bucket(self, length: int) -> tuple[str, ...]:
+        """Return the words having the given number of Aksharas."""
+        return self.buckets.get(length, ())
+
+
+_lexicons: dict[str, Lexicon] = {}
+_lexicons_lock = threading.Lock()
+
+
+def get_lexicon(filename: pathlib.Path) -> Lexicon:
+    """Return the shared lexicon for a file, loading it again once it is saved."""
+
+    key = pathlib.Path(filename).as_posix()
+    mtime = os.stat(filename).st_mtime_ns
+
+    lexicon = _lexicons.get(key)
+    if lexicon is None or lexicon.mtime != mtime:
+        with _lexicons_lock:
+            lexicon = _lexicons.get(key)
+            if lexicon is None or lexicon.mtime != mtime:
+                lexicon = Lexicon(key, tuple(read_words(filename)), mtime)
+                _lexicons[key] = lexicon
+
+    return lexicon
+
+
+class BucketCache[T]:
+    """Class to share an object built from the words of a list with the same length.
+
+    The object of a word list and length is built once, and again once the
+    list is saved, which loads a lexicon with new buckets.
+    """
+
+    def __init__(self, build: Callable[[str, int], T]):
+        self.build = build
+        self._entries: dict[tuple[str, int], tuple[tuple[str, ...], T]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, length: int, filename: pathlib.Path) -> T:
+        """Return the shared object for a word list and length."""
+
+        key = (pathlib.Path(filename).as_posix(), length)
+        words = get_lexicon(filename).bucket(length)
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] is not words:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None or entry[0] is not words:
+                    entry = (words, self.build(*key))
+                    self._entries[key] = entry
+
+        return entry[1]
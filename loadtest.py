@@ -0,0 +1,224 @@
+"""Module to measure the throughput of the game engine with simulated players.
+
+Every player starts a game and guesses until it is over. Most guesses are
+words still consistent with the feedback so far, the rest are random words,
+repeated guesses, guesses of the wrong length and words missing from the
+dictionary, in the proportions of GUESS_MIX. Each player runs in a thread or
+in a process of a pool, and the latency of every stage is reported with the
+guesses per second and the memory held by one session.
+
+    python loadtest.py --players 1000 --workers 8 --processes
+"""
+
+import argparse
+import pathlib
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from engine import MAX_ATTEMPTS, WORD_LENGTH, WORD_LIST, GameSession, parse_guess
+from lexicon import get_lexicon
+from session_store import MemoryStore
+from word_processor import get_word
+
+
+GUESS_MIX = {
+    "consistent": 0.70,
+    "random": 0.15,
+    "repeat": 0.05,
+    "wrong_length": 0.05,
+    "unknown": 0.05,
+}
+
+STAGES = ("new", "parse", "validate", "score", "narrow", "store")
+PERCENTILES = (50, 95, 99)
+
+
+def _pick(session: GameSession, kind: str, rng: random.Random) -> str:
+    """Return a guess of some kind for a game."""
+
+    state = session.state
+    lexicon = get_lexicon(session.word_list)
+    words = lexicon.bucket(state.word_length)
+
+    if kind == "consistent":
+        rows = session.index.indices(session.candidates)
+        if len(rows):
+            return session.index.lexicon.words[int(rng.choice(rows))]
+
+    if kind == "repeat" and state.guesses:
+        return rng.choice(state.guesses)
+
+    if kind == "wrong_length":
+        lengths = [length for length in lexicon.buckets if length != state.word_length]
+        if lengths:
+            return rng.choice(lexicon.bucket(rng.choice(lengths)))
+
+    if kind == "unknown":
+        aksharas = list(get_word(rng.choice(words)).aksharas)
+        rng.shuffle(aksharas)
+        return "".join(aksharas)
+
+    return rng.choice(words)
+
+
+def play(
+    players: int, seed: int, length: int, word_list: pathlib.Path
+) -> tuple[int, dict[str, list[float]]]:
+    """Play some games and return the guesses made and the stage latencies."""
+
+    rng = random.Random(seed)
+    kinds, weights = list(GUESS_MIX), list(GUESS_MIX.values())
+    store = MemoryStore()
+
+    guesses = 0
+    latencies: dict[str, list[float]] = defaultdict(list)
+
+    for player in range(players):
+
+        start = time.perf_counter()
+        session = GameSession.new(length, MAX_ATTEMPTS, word_list, word_list)
+        latencies["new"].append(time.perf_counter() - start)
+
+        while not session.game_over:
+
+            guess = _pick(session, rng.choices(kinds, weights)[0], rng)
+
+            start = time.perf_counter()
+            word = parse_guess(guess)
+            latencies["parse"].append(time.perf_counter() - start)
+            if word is None:
+                continue
+
+            timings: dict[str, float] = {}
+            outcome = session.submit(word, timings)
+            for stage, elapsed in timings.items():
+                latencies[stage].append(elapsed)
+            guesses += 1
+
+            if outcome.valid:
+                start = time.perf_counter()
+                store.put(f"{seed}:{player}", session.to_bytes())
+                latencies["store"].append(time.perf_counter() - start)
+
+    return guesses, dict(latencies)
+
+
+def session_memory(
+    sessions: int, length: int, word_list: pathlib.Path
+) -> tuple[float, float]:
+    """Return the bytes held by a game in memory and once serialized."""
+
+    # Build the shared indexes first so only the sessions are measured.
+    GameSession.new(length, MAX_ATTEMPTS, word_list, word_list)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    games = []
+    for _ in range(sessions):
+        session = GameSession.new(length, MAX_ATTEMPTS, word_list, word_list)
+        for word in get_lexicon(word_list).bucket(length)[:3]:
+            session.submit(parse_guess(word))
+        games.append(session)
+
+    held = (tracemalloc.get_traced_memory()[0] - before) / sessions
+    tracemalloc.stop()
+
+    serialized = sum(len(session.to_bytes()) for session in games) / sessions
+
+    return held, serialized
+
+
+def run(
+    players: int,
+    workers: int,
+    processes: bool = False,
+    length: int = WORD_LENGTH,
+    word_list: pathlib.Path = WORD_LIST,
+    seed: int = 0,
+) -> dict:
+    """Play games across a pool and return the throughput and latencies."""
+
+    chunks = [players // workers + (i < players % workers) for i in range(workers)]
+    pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+
+    # Warm the shared indexes of this process so the first players are not
+    # charged for building them.
+    if not processes:
+        GameSession.new(length, MAX_ATTEMPTS, word_list, word_list)
+
+    guesses = 0
+    latencies: dict[str, list[float]] = defaultdict(list)
+
+    start = time.perf_counter()
+    with pool(max_workers=workers) as executor:
+        futures = [
+            executor.submit(play, chunk, seed + i, length, word_list)
+            for i, chunk in enumerate(chunks)
+            if chunk
+        ]
+        for future in futures:
+            made, stage_latencies = future.result()
+            guesses += made
+            for stage, values in stage_latencies.items():
+                latencies[stage].extend(values)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "players": players,
+        "guesses": guesses,
+        "seconds": elapsed,
+        "guesses_per_second": guesses / elapsed,
+        "latency_ms": {
+            stage: dict(
+                zip(
+                    PERCENTILES,
+                    (np.percentile(latencies[stage], PERCENTILES) * 1000).tolist(),
+                )
+            )
+            for stage in STAGES
+            if latencies[stage]
+        },
+    }
+
+
+def main():
+    """Simulate concurrent players and report throughput, latency and memory."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true")
+    parser.add_argument("--length", type=int, default=WORD_LENGTH)
+    parser.add_argument("--word-list", type=pathlib.Path, default=WORD_LIST)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = run(
+        args.players,
+        args.workers,
+        args.processes,
+        args.length,
+        args.word_list,
+        args.seed,
+    )
+
+    print(
+        f"{report['players']} players, {report['guesses']} guesses in "
+        f"{report['seconds']:.2f}s ({report['guesses_per_second']:.0f} guesses/s)"
+    )
+    for stage, percentiles in report["latency_ms"].items():
+        values = " ".join(f"p{p}={ms:.3f}ms" for p, ms in percentiles.items())
+        print(f"  {stage:<9} {values}")
+
+    held, serialized = session_memory(100, args.length, args.word_list)
+    print(f"memory per session: {held:.0f} B held, {serialized:.0f} B serialized")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Module to deliver log records in the background, in batches.
+
+Loggers only put records on a bounded queue, so the script thread never waits
+on the network. A listener thread takes them off in batches and sends them to
+Logtail. While Logtail cannot be reached the batches go to a local fallback,
+a rotating file or a SQLite database, and Logtail is tried again after a
+pause. When the queue fills up, records below WARNING are dropped first and
+then every record, and the number dropped is logged once there is room.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+MAX_QUEUE = 10000
+HIGH_WATER = 0.8
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 1.0
+RETRY_AFTER = 30.0
+UPLOAD_TIMEOUT = 5.0
+LOGTAIL_HOST = "https://in.logs.betterstack.com"
+STOP_CHECK = 5.0
+
+DEFAULT_FALLBACK = "logs/wordle.log"
+LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Class to put records on a bounded queue, dropping them when it is full."""
+
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+        self._lock_dropped = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord):
+
+        size = self.queue.qsize()
+        overloaded = size >= HIGH_WATER * self.queue.maxsize
+
+        try:
+            if overloaded and record.levelno < logging.WARNING:
+                raise queue.Full
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_dropped:
+                self.dropped += 1
+
+    def take_dropped(self) -> int:
+        """Return the number of records dropped since the last call."""
+
+        with self._lock_dropped:
+            dropped, self.dropped = self.dropped, 0
+
+        return dropped
+
+
+class Sink(ABC):
+    """Class to define where a batch of records is delivered."""
+
+    @abstractmethod
+    def send(self, records: list[logging.LogRecord]) -> bool:
+        """Deliver a batch of records and return whether it succeeded."""
+
+    def close(self):
+        """Release the resources of the sink."""
+
+
+class LogtailSink(Sink):
+    """Class to upload batches of records to Logtail, one request per batch.
+
+    The upload happens on the listener thread and waits for the answer, so a
+    batch Logtail did not accept goes to the fallback instead of being lost.
+    """
+
+    def __init__(self, source_token: str, host: str = LOGTAIL_HOST):
+        self.source_token = source_token
+        self.host = host
+        self._session = None
+
+    def _connect(self):
+        """Import the HTTP client and open a session, on the listener thread."""
+
+        # pylint: disable=import-outside-toplevel
+        import requests
+
+        self._session = requests.Session()
+        self._session.headers.update(
+            {
+                "Authorization": f"Bearer {self.source_token}",
+                "Content-Type": "application/msgpack",
+            }
+        )
+
+    def send(self, records: list[logging.LogRecord]) -> bool:
+
+        # pylint: disable=import-outside-toplevel
+        import msgpack
+        import requests
+        from logtail.frame import create_frame
+        from logtail.helpers import DEFAULT_CONTEXT
+
+        if self._session is None:
+            self._connect()
+
+        frames = [
+            json.loads(
+                json.dumps(
+                    create_frame(record, record.getMessage(), DEFAULT_CONTEXT),
+                    default=str,
+                )
+            )
+            for record in records
+        ]
+
+        try:
+            response = self._session.post(
+                self.host,
+                data=msgpack.packb(frames, use_bin_type=True),
+                timeout=UPLOAD_TIMEOUT,
+            )
+        except requests.RequestException:
+            return False
+
+        return response.ok
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class RotatingFileSink(Sink):
+    """Class to append batches of records to a rotating local file."""
+
+    def __init__(self, path: pathlib.Path):
+
+        pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+        self._handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+        )
+
+    def send(self, records: list[logging.LogRecord]) -> bool:
+        for record in records:
+            self._handler.handle(record)
+        return True
+
+    def close(self):
+        self._handler.close()
+
+
+class SQLiteSink(Sink):
+    """Class to insert batches of records into a local SQLite database."""
+
+    def __init__(self, path: pathlib.Path):
+
+        pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        # Only the listener thread writes, but it is not the one creating it.
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS logs "
+            "(created REAL, level TEXT, name TEXT, message TEXT)"
+        )
+
+    def send(self, records: list[logging.LogRecord]) -> bool:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO logs VALUES (?, ?, ?, ?)",
+                [
+                    (record.created, record.levelname, record.name, record.getMessage())
+                    for record in records
+                ],
+            )
+        return True
+
+    def close(self):
+        self._connection.close()
+
+
+def open_fallback(path: pathlib.Path) -> Sink:
+    """Open the local sink for a path, SQLite for .db files and a file otherwise."""
+
+    if pathlib.Path(path).suffix in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteSink(path)
+
+    return RotatingFileSink(path)
+
+
+class BatchingListener(threading.Thread):
+    """Class to take records off the queue and deliver them in batches."""
+
+    def __init__(
+        self,
+        records: queue.Queue,
+        handler: DroppingQueueHandler,
+        primary: Sink | None,
+        fallback: Sink,
+    ):
+        super().__init__(name="log-listener", daemon=True)
+
+        self.records = records
+        self.handler = handler
+        self.primary = primary
+        self.fallback = fallback
+
+        self._stopping = threading.Event()
+        self._primary_down_until = 0.0
+
+    def _batch(self) -> list[logging.LogRecord]:
+        """Wait for the first record and take the others arriving in time."""
+
+        batch = []
+
+        # An idle listener sleeps until a record comes, or until stop wakes
+        # it with None, and the flush deadline starts with the first record.
+        while not batch:
+            try:
+                record = self.records.get(timeout=STOP_CHECK)
+            except queue.Empty:
+                record = None
+            if record is None:
+                if self._stopping.is_set():
+                    return batch
+                continue
+            batch.append(record)
+
+        deadline = time.monotonic() + FLUSH_INTERVAL
+
+        while len(batch) < BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                record = self.records.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if record is None:
+                break
+            batch.append(record)
+
+        return batch
+
+    def _deliver(self, batch: list[logging.LogRecord]):
+        """Send a batch to Logtail, or to the fallback if that fails."""
+
+        now = time.monotonic()
+        if self.primary is not None and now >= self._primary_down_until:
+            try:
+                if self.primary.send(batch):
+                    return
+            except Exception:  # pylint: disable=broad-except
+                pass
+            self._primary_down_until = now + RETRY_AFTER
+
+        try:
+            self.fallback.send(batch)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    def run(self):
+
+        while not (self._stopping.is_set() and self.records.empty()):
+
+            batch = self._batch()
+
+            dropped = self.handler.take_dropped()
+            if dropped:
+                batch.append(
+                    logging.makeLogRecord(
+                        {
+                            "name": __name__,
+                            "levelno": logging.WARNING,
+                            "levelname": "WARNING",
+                            "msg": f"Dropped {dropped} log records under load.",
+                        }
+                    )
+                )
+
+            if batch:
+                self._deliver(batch)
+
+    def stop(self, timeout: float = UPLOAD_TIMEOUT):
+        """Deliver what is left on the queue and stop."""
+
+        self._stopping.set()
+        try:
+            self.records.put_nowait(None)
+        except queue.Full:
+            pass
+        self.join(timeout)
+
+        for sink in (self.primary, self.fallback):
+            if sink is not None:
+                sink.close()
+
+
+_listener: BatchingListener | None = None
+_listener_lock = threading.Lock()
+
+
+def get_logger(name: str, source_token: str | None = None) -> logging.Logger:
+    """Return a logger whose records are delivered by the background listener.
+
+    The queue and the listener are shared by the whole process and set up on
+    the first call, so calling this on every rerun of the app is cheap.
+    """
+
+    global _listener
+
+    if _listener is None:
+        with _listener_lock:
+            if _listener is None:
+                records = queue.Queue(maxsize=MAX_QUEUE)
+                primary = LogtailSink(source_token) if source_token else None
+                fallback = open_fallback(
+                    os.environ.get("WORDLE_LOG_FALLBACK", DEFAULT_FALLBACK)
+                )
+
+                listener = BatchingListener(
+                    records, DroppingQueueHandler(records), primary, fallback
+                )
+                listener.start()
+                atexit.register(listener.stop)
+                _listener = listener
+
+    logger = logging.getLogger(name)
+    if _listener.handler not in logger.handlers:
+        logger.setLevel(logging.INFO)
+        logger.handlers = [_listener.handler]
+        logger.propagate = False
+
+    return logger
@@ -0,0 +1,360 @@
+"""Module to record finished games and serve statistics about them.
+
+Games go into a SQLite database in WAL mode. The app only puts a result on a
+queue; a writer thread inserts the results in batches, one transaction per
+batch, and adds them to the per-word and per-day totals in the same
+transaction, so the statistics are read from a single row instead of being
+computed from every game. A batch failing twice is written to the log, with
+its games, instead of the database.
+"""
+
+import atexit
+import json
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from engine import GameSession
+from log_pipeline import get_logger
+
+
+DEFAULT_RESULTS = "results/wordle.db"
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 1.0
+RETRY_AFTER = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL,
+    corpus TEXT NOT NULL,
+    day TEXT NOT NULL,
+    guesses TEXT NOT NULL,
+    statuses BLOB NOT NULL,
+    attempts INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    timings TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS word_stats (
+    word TEXT NOT NULL,
+    corpus TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    total_score INTEGER NOT NULL,
+    total_attempts INTEGER NOT NULL,
+    PRIMARY KEY (word, corpus)
+);
+CREATE TABLE IF NOT EXISTS day_stats (
+    day TEXT NOT NULL,
+    corpus TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    total_score INTEGER NOT NULL,
+    total_attempts INTEGER NOT NULL,
+    PRIMARY KEY (day, corpus)
+);
+CREATE INDEX IF NOT EXISTS games_day ON games (day);
+"""
+
+UPSERT = """
+INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT DO UPDATE SET
+    games = games + excluded.games,
+    wins = wins + excluded.wins,
+    total_score = total_score + excluded.total_score,
+    total_attempts = total_attempts + excluded.total_attempts
+"""
+
+
+@dataclass(frozen=True)
+class GameResult:
+    """Class to represent a finished game."""
+
+    word: str
+    corpus: str
+    guesses: tuple[str, ...]
+    statuses: bytes
+    won: bool
+    score: int
+    started: float
+    duration: float
+    timings: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def day(self) -> str:
+        """Return the UTC day the game finished on."""
+
+        finished = self.started + self.duration
+        return datetime.fromtimestamp(finished, timezone.utc).date().isoformat()
+
+    @classmethod
+    def from_session(cls, session: GameSession) -> "GameResult":
+        """Return the result of a finished game."""
+
+        state = session.state
+
+        return cls(
+            word=state.secret,
+            corpus=pathlib.Path(session.word_list).as_posix(),
+            guesses=tuple(state.guesses),
+            statuses=state.statuses.tobytes(),
+            won=state.won,
+            score=state.score,
+            started=state.started,
+            duration=max(time.time() - state.started, 0.0),
+            timings=dict(session.timings),
+        )
+
+
+@dataclass(frozen=True)
+class Stats:
+    """Class to represent the totals of a word or a day."""
+
+    games: int = 0
+    wins: int = 0
+    total_score: int = 0
+    total_attempts: int = 0
+
+    @property
+    def win_rate(self) -> float:
+        """Return the share of games won."""
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def average_score(self) -> float:
+        """Return the average score."""
+        return self.total_score / self.games if self.games else 0.0
+
+    @property
+    def average_attempts(self) -> float:
+        """Return the average number of guesses."""
+        return self.total_attempts / self.games if self.games else 0.0
+
+
+class ResultsStore:
+    """Class to write results in the background and read their statistics."""
+
+    def __init__(self, path: pathlib.Path):
+
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+        self._results: queue.Queue[GameResult | None] = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._write, name="results-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread."""
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+
+        return connection
+
+    def record(self, result: GameResult):
+        """Queue a finished game to be written."""
+        self._results.put(result)
+
+    def _batch(self) -> tuple[list[GameResult], bool]:
+        """Wait for the first result and take the others arriving in time."""
+
+        batch: list[GameResult] = []
+        deadline = time.monotonic() + FLUSH_INTERVAL
+
+        while len(batch) < BATCH_SIZE:
+            timeout = None if not batch else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                result = self._results.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if result is None:
+                return batch, True
+            batch.append(result)
+
+        return batch, False
+
+    def _write(self):
+        """Insert batches of results until the store is closed."""
+
+        while True:
+            batch, closing = self._batch()
+            if batch:
+                self._insert_or_spill(batch)
+            if closing:
+                break
+
+    def _insert_or_spill(self, batch: list[GameResult]):
+        """Insert a batch, retrying once, or log the games it holds."""
+
+        error = None
+        for attempt in range(2):
+            try:
+                self.insert(batch)
+                return
+            except sqlite3.Error as exc:
+                error = exc
+                if not attempt:
+                    time.sleep(RETRY_AFTER)
+
+        # A broken batch must not stop the writer for the next ones, so the
+        # games go to the log, where they can be inserted again later.
+        get_logger(__name__).error(
+            "Could not write %d finished games to %s: %s",
+            len(batch),
+            self.path,
+            json.dumps(
+                [
+                    {
+                        "word": result.word,
+                        "corpus": result.corpus,
+                        "guesses": result.guesses,
+                        "statuses": result.statuses.hex(),
+                        "won": result.won,
+                        "score": result.score,
+                        "started": result.started,
+                        "duration": result.duration,
+                        "timings": result.timings,
+                    }
+                    for result in batch
+                ],
+                ensure_ascii=False,
+            ),
+            exc_info=error,
+        )
+
+    def insert(self, results: list[GameResult]):
+        """Insert results and add them to the totals in one transaction."""
+
+        words: dict[tuple[str, str], list[int]] = {}
+        days: dict[tuple[str, str], list[int]] = {}
+        for result in results:
+            totals = (1, int(result.won), result.score, len(result.guesses))
+            for table, key in (
+                (words, (result.word, result.corpus)),
+                (days, (result.day, result.corpus)),
+            ):
+                row = table.setdefault(key, [0, 0, 0, 0])
+                for column, value in enumerate(totals):
+                    row[column] += value
+
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT INTO games VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        result.word,
+                        result.corpus,
+                        result.day,
+                        ",".join(result.guesses),
+                        result.statuses,
+                        len(result.guesses),
+                        int(result.won),
+                        result.score,
+                        result.started,
+                        result.duration,
+                        json.dumps(result.timings),
+                    )
+                    for result in results
+                ],
+            )
+            connection.executemany(
+                UPSERT.format(table="word_stats"),
+                [(*key, *row) for key, row in words.items()],
+            )
+            connection.executemany(
+                UPSERT.format(table="day_stats"),
+                [(*key, *row) for key, row in days.items()],
+            )
+
+    def close(self):
+        """Write the queued results and stop the writer."""
+
+        self._results.put(None)
+        self._writer.join()
+
+    def word_stats(self, word: str, corpus: str) -> Stats:
+        """Return the totals of a word."""
+
+        row = (
+            self._connection()
+            .execute(
+                "SELECT games, wins, total_score, total_attempts FROM word_stats "
+                "WHERE word = ? AND corpus = ?",
+                (word, corpus),
+            )
+            .fetchone()
+        )
+        return Stats(*row) if row else Stats()
+
+    def day_stats(self, day: str, corpus: str) -> Stats:
+        """Return the totals of a day."""
+
+        row = (
+            self._connection()
+            .execute(
+                "SELECT games, wins, total_score, total_attempts FROM day_stats "
+                "WHERE day = ? AND corpus = ?",
+                (day, corpus),
+            )
+            .fetchone()
+        )
+        return Stats(*row) if row else Stats()
+
+    def hardest_words(
+        self, corpus: str, limit: int = 10, min_games: int = 5
+    ) -> list[tuple[str, Stats]]:
+        """Return the words with the lowest average score."""
+
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT word, games, wins, total_score, total_attempts FROM word_stats "
+                "WHERE corpus = ? AND games >= ? "
+                "ORDER BY CAST(total_score AS REAL) / games, games DESC LIMIT ?",
+                (corpus, min_games, limit),
+            )
+            .fetchall()
+        )
+        return [(word, Stats(*totals)) for word, *totals in rows]
+
+
+_store: ResultsStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    """Return the results store of this process."""
+
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResultsStore(os.environ.get("WORDLE_RESULTS", DEFAULT_RESULTS))
+                atexit.register(_store.close)
+
+    return _store
+
+
+def today() -> str:
+    """Return the current UTC day."""
+    return datetime.now(timezone.utc).date().isoformat()
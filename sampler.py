@@ -0,0 +1,112 @@
+"""Module to sample secret words from the length-bucketed lexicon."""
+
+import datetime
+import pathlib
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+from lexicon import BucketCache, get_lexicon
+
+
+EPOCH = datetime.date(2024, 1, 1)
+DEFAULT_WINDOW = 30
+
+
+@dataclass
+class WordSampler:
+    """Class to draw words with a fixed number of Aksharas from a word list."""
+
+    filename: str
+    length: int
+    seed: int | str | None = None
+    window: int = 0
+    batch: int = 32
+
+    words: tuple[str, ...] = field(default=(), init=False)
+
+    _random: random.Random = field(init=False, repr=False)
+    _recent: deque = field(init=False, repr=False)
+    _upcoming: deque = field(init=False, repr=False)
+    _cycles: dict[int, list[str]] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+
+        self.words = get_lexicon(self.filename).bucket(self.length)
+
+        # The window can never cover the whole bucket, otherwise nothing is left.
+        self.window = max(0, min(self.window, len(self.words) - 1))
+
+        self._random = random.Random(self.seed)
+        self._recent = deque(maxlen=self.window or None)
+        self._upcoming = deque()
+
+    def _draw(self) -> str:
+        """Draw a word that is not among the last `window` draws."""
+
+        while True:
+            word = self._random.choice(self.words)
+            if not self.window or word not in self._recent:
+                break
+
+        if self.window:
+            self._recent.append(word)
+
+        return word
+
+    def next_word(self) -> str | None:
+        """Return the next secret word from the precomputed schedule."""
+
+        if not self.words:
+            return None
+
+        with self._lock:
+            if not self._upcoming:
+                self._upcoming.extend(self._draw() for _ in range(self.batch))
+            return self._upcoming.popleft()
+
+    def _cycle(self, cycle: int) -> list[str]:
+        """Return the shuffled order of the words for a cycle of days."""
+
+        order = self._cycles.get(cycle)
+        if order is None:
+            order = list(self.words)
+            random.Random(f"{self.seed}:{cycle}").shuffle(order)
+            self._cycles[cycle] = order
+
+        return order
+
+    def word_of_the_day(self, day: datetime.date | None = None) -> str | None:
+        """Return the word for a day, the same for every session and process."""
+
+        if not self.words:
+            return None
+
+        day = day or datetime.date.today()
+        cycle, index = divmod((day - EPOCH).days, len(self.words))
+
+        return self._cycle(cycle)[index]
+
+    def schedule(
+        self, days: int, start: datetime.date | None = None
+    ) -> list[tuple[datetime.date, str]]:
+        """Return the words of the day for a number of days from a start date."""
+
+        start = start or datetime.date.today()
+        dates = [start + datetime.timedelta(days=offset) for offset in range(days)]
+
+        return [(day, self.word_of_the_day(day)) for day in dates]
+
+
+_samplers = BucketCache(
+    lambda filename, length: WordSampler(filename, length, window=DEFAULT_WINDOW)
+)
+
+
+def get_sampler(length: int, filename: pathlib.Path) -> WordSampler:
+    """Return the shared sampler for a word list and length."""
+    return _samplers.get(length, filename)
@@ -0,0 +1,207 @@
+"""Module to keep serialized game states outside of the Streamlit process.
+
+The store is chosen by the WORDLE_SESSION_STORE environment variable:
+
+    memory://               a dictionary in this process (the default)
+    sqlite:///sessions.db   a SQLite file shared by the processes of a host
+    redis://localhost:6379  a Redis-compatible server shared by every replica
+
+Every store forgets a session SESSION_TTL seconds after it was last saved,
+so the games of closed tabs do not pile up. The memory store also keeps at
+most MAX_SESSIONS games, dropping the least recently saved first.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+
+DEFAULT_STORE = "memory://"
+SESSION_TTL = 7 * 24 * 60 * 60
+MAX_SESSIONS = 100_000
+PRUNE_INTERVAL = 60 * 60
+
+
+class SessionStore(ABC):
+    """Class to define the interface of a session store."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> bytes | None:
+        """Return the state saved for a session, if any."""
+
+    @abstractmethod
+    def put(self, session_id: str, state: bytes):
+        """Save the state of a session."""
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Forget a session."""
+
+
+class MemoryStore(SessionStore):
+    """Class to keep the sessions in a dictionary of this process."""
+
+    def __init__(self, ttl: int = SESSION_TTL, max_sessions: int = MAX_SESSIONS):
+
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+
+        # Session ids with the time they were saved and their state, the
+        # least recently saved first.
+        self._sessions: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> bytes | None:
+
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[0] < time.monotonic() - self.ttl:
+            return None
+
+        return entry[1]
+
+    def put(self, session_id: str, state: bytes):
+
+        now = time.monotonic()
+
+        with self._lock:
+
+            self._sessions[session_id] = (now, state)
+            self._sessions.move_to_end(session_id)
+
+            while self._sessions:
+                updated, _ = next(iter(self._sessions.values()))
+                if len(self._sessions) <= self.max_sessions and (
+                    updated >= now - self.ttl
+                ):
+                    break
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SQLiteStore(SessionStore):
+    """Class to keep the sessions in a SQLite file."""
+
+    def __init__(self, path: str, ttl: int = SESSION_TTL):
+
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._next_prune = 0.0
+
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(id TEXT PRIMARY KEY, state BLOB NOT NULL, updated REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread."""
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+
+        return connection
+
+    def get(self, session_id: str) -> bytes | None:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT state FROM sessions WHERE id = ? AND updated >= ?",
+                (session_id, time.time() - self.ttl),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def put(self, session_id: str, state: bytes):
+
+        now = time.time()
+
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                (session_id, state, now),
+            )
+
+            # The expired sessions are deleted at most every PRUNE_INTERVAL.
+            if now >= self._next_prune:
+                self._next_prune = now + PRUNE_INTERVAL
+                connection.execute(
+                    "DELETE FROM sessions WHERE updated < ?", (now - self.ttl,)
+                )
+
+    def delete(self, session_id: str):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
+class RedisStore(SessionStore):
+    """Class to keep the sessions in a Redis-compatible server."""
+
+    def __init__(self, url: str, ttl: int = SESSION_TTL):
+
+        # Only needed when the store is used, so it is not a dependency.
+        import redis  # pylint: disable=import-outside-toplevel
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, session_id: str) -> bytes | None:
+        return self._client.get(f"wordle:{session_id}")
+
+    def put(self, session_id: str, state: bytes):
+        self._client.set(f"wordle:{session_id}", state, ex=self.ttl)
+
+    def delete(self, session_id: str):
+        self._client.delete(f"wordle:{session_id}")
+
+
+def open_store(url: str) -> SessionStore:
+    """Open the session store described by a URL."""
+
+    parsed = urlparse(url)
+
+    if parsed.scheme == "memory":
+        return MemoryStore()
+    if parsed.scheme == "sqlite":
+        return SQLiteStore(parsed.path.removeprefix("/") or "sessions.db")
+    if parsed.scheme in ("redis", "rediss", "unix"):
+        return RedisStore(url)
+
+    raise ValueError(f"Unknown session store {url}.")
+
+
+_store: SessionStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SessionStore:
+    """Return the session store of this process."""
+
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = open_store(
+                    os.environ.get("WORDLE_SESSION_STORE", DEFAULT_STORE)
+                )
+
+    return _store
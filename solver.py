@@ -0,0 +1,276 @@
+"""Module to suggest guesses that maximise the expected information.
+
+Run `python solver.py data/raamaayana.csv 3` to play every secret word of a
+list and report how many guesses the solver needs.
+"""
+
+import argparse
+import os
+import pathlib
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import feedback_matrix
+from evaluate import (
+    CellStatus,
+    EncodedLexicon,
+    batch_score,
+    encode_lexicon,
+    pack_status,
+    unpack_code,
+)
+from lexicon import BucketCache, get_lexicon
+
+
+HINT_BUDGET = 0.08
+POOL_SIZE = 200
+MAX_ATTEMPTS = 10
+
+History = list[tuple[str, list[tuple[CellStatus, CellStatus]]]]
+
+
+def entropy(codes: np.ndarray) -> float:
+    """Return the entropy in bits of the feedback codes of one guess."""
+
+    _, counts = np.unique(codes, return_counts=True)
+    probabilities = counts / codes.size
+
+    return float(-(probabilities * np.log2(probabilities)).sum())
+
+
+@dataclass
+class Solver:
+    """Class to narrow down and suggest secret words of one length."""
+
+    filename: str
+    length: int
+
+    lexicon: EncodedLexicon = field(init=False, repr=False)
+    matrix: np.ndarray | None = field(init=False, repr=False)
+    index: dict[str, int] = field(init=False, repr=False)
+
+    _opener: str | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+
+        words = get_lexicon(self.filename).bucket(self.length)
+
+        self.lexicon = encode_lexicon(words)
+        self.matrix = feedback_matrix.load(self.filename, self.length)
+        self.index = {word: row for row, word in enumerate(words)}
+
+        # The list may have been saved again since the matrix was loaded.
+        if self.matrix is not None and self.matrix.shape != (len(words), len(words)):
+            self.matrix = None
+
+    @property
+    def words(self) -> tuple[str, ...]:
+        """Return the words the secret is drawn from."""
+        return self.lexicon.words
+
+    def _codes(self, guess: str, secrets: np.ndarray) -> np.ndarray:
+        """Return the feedback codes of a guess against some of the secrets."""
+
+        row = self.index.get(guess)
+        if self.matrix is not None and row is not None:
+            return self.matrix[row, secrets]
+
+        codes = batch_score(guess, self.lexicon)
+        return codes[secrets]
+
+    def candidates(self, history: History) -> np.ndarray:
+        """Return the indices of the words consistent with every guess so far."""
+
+        remaining = np.arange(len(self.words))
+
+        for guess, status in history:
+            codes = self._codes(guess, remaining)
+            remaining = remaining[codes == pack_status(status)]
+
+        return remaining
+
+    def rank(
+        self,
+        remaining: np.ndarray,
+        budget: float | None = HINT_BUDGET,
+        pool_size: int | None = None,
+    ) -> list[tuple[float, str]]:
+        """Rank guesses by the entropy of their feedback over the remaining words.
+
+        Remaining words are tried first, then the rest of the list, until the
+        time budget or the pool size runs out. Guesses that could still be the
+        secret get a small bonus, since they might win outright.
+        """
+
+        deadline = None if budget is None else time.perf_counter() + budget
+
+        candidates = set(remaining.tolist())
+        pool = list(remaining) + [
+            row for row in range(len(self.words)) if row not in candidates
+        ]
+        pool = pool[:pool_size]
+
+        ranking = []
+        for row in pool:
+
+            guess = self.words[row]
+            information = entropy(self._codes(guess, remaining))
+            if row in candidates:
+                information += 1 / len(remaining)
+
+            ranking.append((information, guess))
+
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+
+        ranking.sort(key=lambda item: -item[0])
+
+        return ranking
+
+    def opener(self, budget: float | None = None) -> str:
+        """Return the best first guess over the whole list.
+
+        The full ranking is computed once and kept. Until then, a budget
+        returns the best guess found in time.
+        """
+
+        if self._opener is not None:
+            return self._opener
+
+        remaining = np.arange(len(self.words))
+        pool_size = None if self.matrix is not None else POOL_SIZE
+        ranking = self.rank(remaining, budget, pool_size)
+
+        if len(ranking) == len(self.words[:pool_size]):
+            self._opener = ranking[0][1]
+
+        return ranking[0][1]
+
+    def suggest(
+        self,
+        history: History,
+        budget: float | None = HINT_BUDGET,
+        pool_size: int | None = None,
+        remaining: np.ndarray | None = None,
+    ) -> tuple[str | None, int]:
+        """Return the suggested next guess and the number of words remaining.
+
+        The budget covers the whole call, finding the remaining words too,
+        unless the caller already knows their rows and passes them.
+        """
+
+        start = time.perf_counter()
+
+        if not history and self.words:
+            return self.opener(budget), len(self.words)
+
+        if remaining is None:
+            remaining = self.candidates(history)
+
+        if len(remaining) <= 2:
+            guess = self.words[remaining[0]] if len(remaining) else None
+            return guess, len(remaining)
+
+        if budget is not None:
+            budget = max(budget - (time.perf_counter() - start), 0.0)
+
+        return self.rank(remaining, budget, pool_size)[0][1], len(remaining)
+
+    def play(self, secret: str, max_attempts: int = MAX_ATTEMPTS) -> int | None:
+        """Play one game and return the number of guesses, or None if lost."""
+
+        history = []
+        secrets = np.array([self.index[secret]])
+
+        for attempt in range(1, max_attempts + 1):
+
+            guess, _ = self.suggest(history, budget=None, pool_size=POOL_SIZE)
+            if guess is None:
+                return None
+            if guess == secret:
+                return attempt
+
+            code = int(self._codes(guess, secrets)[0])
+            history.append((guess, unpack_code(code, self.length)))
+
+        return None
+
+
+_solvers = BucketCache(Solver)
+
+
+def get_solver(length: int, filename: pathlib.Path) -> Solver:
+    """Return the shared solver for a word list and length."""
+    return _solvers.get(length, filename)
+
+
+_worker_solver: Solver | None = None
+
+
+def _init_worker(filename: str, length: int, opener: str):
+    """Build the solver once in every worker process."""
+
+    global _worker_solver
+    _worker_solver = get_solver(length, filename)
+    _worker_solver._opener = opener  # pylint: disable=protected-access
+
+
+def _play(secrets: list[str]) -> list[int | None]:
+    """Play a chunk of games in a worker process."""
+    return [_worker_solver.play(secret) for secret in secrets]
+
+
+def simulate(
+    filename: pathlib.Path, length: int, workers: int | None = None
+) -> Counter:
+    """Play every secret word of a list in parallel and count the guesses needed."""
+
+    solver = get_solver(length, filename)
+    opener = solver.opener()
+
+    workers = workers or os.cpu_count()
+    secrets = list(solver.words)
+    chunks = [secrets[start::workers] for start in range(workers)]
+
+    results = Counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(solver.filename, length, opener),
+    ) as executor:
+        for outcomes in executor.map(_play, chunks):
+            results.update(outcomes)
+
+    return results
+
+
+def main():
+    """Play every secret word of a list and report the guesses needed."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("filename", type=pathlib.Path)
+    parser.add_argument("length", type=int)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = simulate(args.filename, args.length, args.workers)
+    elapsed = time.perf_counter() - start
+
+    games = sum(results.values())
+    solved = [guesses for guesses in results.elements() if guesses is not None]
+
+    print(f"{games} games in {elapsed:.1f}s ({games / elapsed:.1f} games/s)")
+    for guesses in sorted(g for g in results if g is not None):
+        print(f"{guesses:>2} guesses: {results[guesses]}")
+    print(f"failed: {results[None]}")
+    if solved:
+        print(f"mean guesses: {sum(solved) / len(solved):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Module to suggest the dictionary words closest to a rejected guess.
+
+The distance between two words with the same number of Aksharas is the sum,
+over their positions, of the edit distance between the Varnas of the two
+Aksharas. So रोम and श्राम are both 1 away from राम, with a Svara replaced
+in the first and a Vyanjana added in the second.
+
+A word at most k away from a guess of n Aksharas, with k below n, has at
+least n - k of its Aksharas exactly where the guess has them. So every word
+is indexed under each of its Aksharas with its position, which is the word
+with all its other Aksharas deleted, and only the words sharing one with the
+guess are measured. The index of a word list and length is built once and
+shared by every session, and a search gives up after a few milliseconds with
+what it found.
+
+    python suggestions.py data/amara.csv रमा गङ्ग
+"""
+
+import argparse
+import pathlib
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from lexicon import BucketCache, get_lexicon
+from word_processor import get_word
+
+
+MAX_DISTANCE = 2
+SUGGESTIONS = 3
+BUDGET = 0.005
+
+# How many words are measured between two looks at the clock.
+CLOCK_EVERY = 64
+
+
+@lru_cache(maxsize=65536)
+def akshara_distance(first: tuple[str, ...], second: tuple[str, ...]) -> int:
+    """Return the edit distance between the Varnas of two Aksharas."""
+
+    previous = list(range(len(second) + 1))
+    for i, varna in enumerate(first, 1):
+        current = [i]
+        for j, other in enumerate(second, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (varna != other),
+                )
+            )
+        previous = current
+
+    return previous[-1]
+
+
+def distance(first: list[tuple], second: list[tuple]) -> int:
+    """Return the distance between the Vinyaasas of two words of the same length."""
+    return sum(akshara_distance(a, b) for a, b in zip(first, second))
+
+
+@dataclass
+class SuggestionIndex:
+    """Class to hold the words of a list with the same length by Akshara and position."""
+
+    filename: pathlib.Path
+    length: int
+    words: tuple[str, ...] = field(init=False, repr=False)
+
+    # Word i has the Aksharas _aksharas[c] for c in _codes[i], and is in the
+    # postings of every (position, code) of it, in the order of the list.
+    _aksharas: list[tuple[str, ...]] = field(init=False, repr=False)
+    _codes: list[tuple[int, ...]] = field(init=False, repr=False)
+    _numbers: dict[tuple[str, ...], int] = field(init=False, repr=False)
+    _postings: dict[tuple[int, int], list[int]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+
+        self.words = get_lexicon(self.filename).bucket(self.length)
+
+        self._numbers = {}
+        self._codes = [
+            tuple(
+                self._numbers.setdefault(vinyaasa, len(self._numbers))
+                for vinyaasa in get_word(word).vinyaasas
+            )
+            for word in self.words
+        ]
+        self._aksharas = list(self._numbers)
+
+        self._postings = {}
+        for node, codes in enumerate(self._codes):
+            for position, code in enumerate(codes):
+                self._postings.setdefault((position, code), []).append(node)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _candidates(self, vinyaasas: list[tuple[str, ...]]) -> list[int]:
+        """Return the words having an Akshara of the guess at the same position."""
+
+        nodes = set()
+        for position, vinyaasa in enumerate(vinyaasas):
+            code = self._numbers.get(vinyaasa)
+            nodes.update(self._postings.get((position, code), ()))
+
+        return sorted(nodes)
+
+    def suggest(
+        self,
+        guess: str,
+        limit: int = SUGGESTIONS,
+        max_distance: int = MAX_DISTANCE,
+        budget: float = BUDGET,
+        exclude: set[str] | frozenset[str] = frozenset(),
+    ) -> list[str]:
+        """Return the closest words to a guess, the earlier in the list first.
+
+        The words always share an Akshara with the guess, so the distance is
+        at most one less than the number of Aksharas.
+        """
+
+        word = get_word(guess)
+        if not self.words or len(word.aksharas) != self.length:
+            return []
+
+        max_distance = min(max_distance, self.length - 1)
+        deadline = time.perf_counter() + budget
+
+        # The distance of every Akshara of the guess to the Aksharas of the
+        # list, filled in as the words measured need them.
+        columns = [{} for _ in word.vinyaasas]
+
+        found = []
+        for measured, node in enumerate(self._candidates(word.vinyaasas), 1):
+
+            if not measured % CLOCK_EVERY and time.perf_counter() > deadline:
+                break
+
+            d = 0
+            for column, akshara, code in zip(
+                columns, word.vinyaasas, self._codes[node]
+            ):
+                cell = column.get(code)
+                if cell is None:
+                    cell = column[code] = akshara_distance(
+                        akshara, self._aksharas[code]
+                    )
+                d += cell
+                if d > max_distance:
+                    break
+
+            if 0 < d <= max_distance and self.words[node] not in exclude:
+                found.append((d, node))
+
+        found.sort()
+        return [self.words[node] for _, node in found[:limit]]
+
+
+_indexes = BucketCache(SuggestionIndex)
+
+
+def get_suggestion_index(length: int, filename: pathlib.Path) -> SuggestionIndex:
+    """Return the shared suggestion index for a word list and length."""
+    return _indexes.get(length, filename)
+
+
+def main():
+    """Suggest the closest words of a list to some guesses."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("filename", type=pathlib.Path)
+    parser.add_argument("guesses", nargs="+")
+    parser.add_argument("--limit", type=int, default=SUGGESTIONS)
+    parser.add_argument("--max-distance", type=int, default=MAX_DISTANCE)
+    args = parser.parse_args()
+
+    for guess in args.guesses:
+
+        length = len(get_word(guess).aksharas)
+
+        start = time.perf_counter()
+        index = get_suggestion_index(length, args.filename)
+        built = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = index.suggest(guess, args.limit, args.max_distance)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{guess}: {', '.join(found) or '-'} "
+            f"({elapsed * 1e3:.2f} ms, {len(index)} words indexed in {built:.2f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Module to look up synonyms from an interned, CSR-style synonym graph.
+
+Every line of synonyms.csv holds a headword, the name of its group and the
+space separated members of the group. Words and groups are interned to
+integer ids, and two pairs of offset and id arrays map a word to its groups
+(headword groups first) and a group to its members.
+"""
+
+import pathlib
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from lexicon import cache_path
+
+
+SUFFIX = "syn.npz"
+
+
+def _strings(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Return the offsets and the UTF-8 bytes of a list of strings."""
+
+    blobs = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+
+    return offsets, np.frombuffer(b"".join(blobs), dtype=np.uint8)
+
+
+def _unstrings(offsets: np.ndarray, blob: np.ndarray) -> list[str]:
+    """Return the strings stored by `_strings`."""
+
+    data = blob.tobytes()
+    return [
+        data[start:end].decode("utf-8")
+        for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+    ]
+
+
+def _csr(rows: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+    """Return the offsets and the ids of a list of id lists."""
+
+    indptr = np.zeros(len(rows) + 1, dtype=np.int32)
+    np.cumsum([len(row) for row in rows], out=indptr[1:])
+    indices = np.fromiter(
+        (i for row in rows for i in row), dtype=np.int32, count=int(indptr[-1])
+    )
+
+    return indptr, indices
+
+
+@dataclass
+class SynonymGraph:
+    """Class to hold the words and synonym groups of a synonym list."""
+
+    words: list[str]
+    groups: list[str]
+    word_indptr: np.ndarray
+    word_groups: np.ndarray
+    group_indptr: np.ndarray
+    group_members: np.ndarray
+
+    def __post_init__(self):
+        self.index = {word: i for i, word in enumerate(self.words)}
+
+    @classmethod
+    def from_csv(cls, filename: pathlib.Path) -> "SynonymGraph":
+        """Parse a synonym list with headword, group and member columns."""
+
+        word_ids: dict[str, int] = {}
+        group_ids: dict[tuple[str, str], int] = {}
+        groups: list[str] = []
+        members: list[list[int]] = []
+        headword_of: list[list[int]] = []
+        member_of: list[list[int]] = []
+
+        def intern(word: str) -> int:
+            if word not in word_ids:
+                word_ids[word] = len(word_ids)
+                headword_of.append([])
+                member_of.append([])
+            return word_ids[word]
+
+        with open(filename, "r", encoding="utf-8") as file:
+            for line in file:
+
+                headword, group, words = line.rstrip("\n").split(",", 2)
+
+                key = (group, words)
+                if key not in group_ids:
+                    group_ids[key] = len(groups)
+                    groups.append(group)
+                    ids = [intern(word) for word in words.split()]
+                    members.append(ids)
+                    for i in dict.fromkeys(ids):
+                        member_of[i].append(group_ids[key])
+
+                headword_of[intern(headword)].append(group_ids[key])
+
+        word_groups = [
+            list(dict.fromkeys(headword_of[i] + member_of[i]))
+            for i in range(len(word_ids))
+        ]
+
+        return cls(list(word_ids), groups, *_csr(word_groups), *_csr(members))
+
+    def save(self, path: pathlib.Path):
+        """Write the graph to a binary file."""
+
+        word_offsets, word_text = _strings(self.words)
+        group_offsets, group_text = _strings(self.groups)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp")
+
+        with open(tmp, "wb") as file:
+            np.savez(
+                file,
+                word_offsets=word_offsets,
+                word_text=word_text,
+                group_offsets=group_offsets,
+                group_text=group_text,
+                word_indptr=self.word_indptr,
+                word_groups=self.word_groups,
+                group_indptr=self.group_indptr,
+                group_members=self.group_members,
+            )
+
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "SynonymGraph":
+        """Read a graph written by `save`."""
+
+        with np.load(path) as data:
+            return cls(
+                _unstrings(data["word_offsets"], data["word_text"]),
+                _unstrings(data["group_offsets"], data["group_text"]),
+                data["word_indptr"],
+                data["word_groups"],
+                data["group_indptr"],
+                data["group_members"],
+            )
+
+    def group_ids(self, word: str) -> list[int]:
+        """Return the ids of the groups of a word, headword groups first."""
+
+        i = self.index.get(word)
+        if i is None:
+            return []
+
+        return self.word_groups[self.word_indptr[i] : self.word_indptr[i + 1]].tolist()
+
+    def members(self, group: int) -> list[str]:
+        """Return the words of a group."""
+
+        ids = self.group_members[
+            self.group_indptr[group] : self.group_indptr[group + 1]
+        ]
+        return [self.words[i] for i in ids.tolist()]
+
+    def lookup(self, word: str) -> list[str] | None:
+        """Return the synonyms of a word from its first group, if any."""
+
+        groups = self.group_ids(word)
+        return self.members(groups[0]) if groups else None
+
+    def lookup_many(self, words: list[str]) -> dict[str, list[str] | None]:
+        """Return the synonyms of many words."""
+        return {word: self.lookup(word) for word in words}
+
+
+_graphs: dict[str, SynonymGraph] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_synonym_graph(
+    filename: pathlib.Path = "data/synonyms.csv",
+) -> SynonymGraph:
+    """Return the shared synonym graph, loading the binary copy when present."""
+
+    key = pathlib.Path(filename).as_posix()
+
+    graph = _graphs.get(key)
+    if graph is None:
+        with _graphs_lock:
+            graph = _graphs.get(key)
+            if graph is None:
+                path = cache_path(filename, SUFFIX)
+                if path.exists():
+                    graph = SynonymGraph.load(path)
+                else:
+                    graph = SynonymGraph.from_csv(filename)
+                    try:
+                        graph.save(path)
+                    except OSError:
+                        pass
+                _graphs[key] = graph
+
+    return graph
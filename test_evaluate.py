@@ -0,0 +1,86 @@
+"""Tests of the fast scoring paths of evaluate.py against Compare.
+
+    python -m unittest test_evaluate
+"""
+
+import pathlib
+import random
+import threading
+import unittest
+
+import evaluate
+from evaluate import Compare, batch_score, encode_lexicon, pack_status, score
+from lexicon import get_lexicon
+
+
+DATA = pathlib.Path(__file__).resolve().parent / "data"
+SAMPLE = 60
+SEED = 0
+
+
+def _statuses(word: str, guess: str) -> tuple:
+    """Return the statuses Compare gives to a guess."""
+
+    compare = Compare(word, guess)
+    compare.compare()
+    return tuple(compare.status)
+
+
+class TestScore(unittest.TestCase):
+    """Class to check score and batch_score on a fixed sample of words."""
+
+    def check_sample(self, filename: str, length: int):
+        """Compare every pair of a seeded sample of a word list and length."""
+
+        words = get_lexicon(DATA / filename).bucket(length)
+        sample = random.Random(SEED).sample(words, min(SAMPLE, len(words)))
+        lexicon = encode_lexicon(sample)
+
+        for guess in sample:
+            codes = batch_score(guess, lexicon).tolist()
+            for word, code in zip(sample, codes):
+                expected = _statuses(word, guess)
+                with self.subTest(word=word, guess=guess):
+                    self.assertEqual(score(word, guess), expected)
+                    self.assertEqual(code, pack_status(expected))
+
+    def test_raamaayana(self):
+        self.check_sample("raamaayana.csv", 3)
+
+    def test_amara(self):
+        self.check_sample("amara.csv", 2)
+
+    def test_amara_long(self):
+        self.check_sample("amara.csv", 4)
+
+
+class TestVarnaId(unittest.TestCase):
+    """Class to check that concurrent sessions never share a Varna id."""
+
+    def test_concurrent_ids(self):
+
+        varnas = [f"test-varna-{i}" for i in range(2000)]
+        barrier = threading.Barrier(8)
+
+        def assign(offset: int):
+            barrier.wait()
+            for varna in varnas[offset:] + varnas[:offset]:
+                evaluate.varna_id(varna)
+
+        threads = [
+            threading.Thread(target=assign, args=(offset * 250,)) for offset in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ids = [evaluate.varna_id(varna) for varna in varnas]
+        self.assertEqual(len(set(ids)), len(varnas))
+        self.assertEqual(
+            len(set(evaluate._varna_ids.values())), len(evaluate._varna_ids)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
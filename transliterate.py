@@ -0,0 +1,285 @@
+"""Module to transliterate Romanized Sanskrit into Devanagari offline.
+
+IAST, Harvard-Kyoto, ITRANS and a loose phonetic spelling are compiled into a
+single trie of Roman spellings. A guess is split along every path of the trie
+with a small beam, so ambiguous spellings like "s" (स, श or ष) or "a" (अ or
+आ) give several ranked candidates. Cheaper candidates use longer matches and
+the exact schemes before the loose spellings.
+"""
+
+import pathlib
+from dataclasses import dataclass
+from functools import lru_cache
+
+from lexicon import count_aksharas, get_lexicon
+
+
+VIRAMA = "्"
+
+# Independent vowel and its sign after a consonant.
+VOWELS = {
+    "अ": "",
+    "आ": "ा",
+    "इ": "ि",
+    "ई": "ी",
+    "उ": "ु",
+    "ऊ": "ू",
+    "ऋ": "ृ",
+    "ॠ": "ॄ",
+    "ऌ": "ॢ",
+    "ॡ": "ॣ",
+    "ए": "े",
+    "ऐ": "ै",
+    "ओ": "ो",
+    "औ": "ौ",
+}
+
+MARKS = ("ं", "ः")
+
+# Devanagari followed by its IAST, Harvard-Kyoto and ITRANS spellings.
+SCHEMES = [
+    ("अ", "a", "a", "a"),
+    ("आ", "ā", "A", "A aa"),
+    ("इ", "i", "i", "i"),
+    ("ई", "ī", "I", "I ii"),
+    ("उ", "u", "u", "u"),
+    ("ऊ", "ū", "U", "U uu"),
+    ("ऋ", "ṛ", "R", "RRi R^i"),
+    ("ॠ", "ṝ", "RR", "RRI R^I"),
+    ("ऌ", "ḷ", "lR", "LLi L^i"),
+    ("ॡ", "ḹ", "lRR", "LLI L^I"),
+    ("ए", "e", "e", "e"),
+    ("ऐ", "ai", "ai", "ai"),
+    ("ओ", "o", "o", "o"),
+    ("औ", "au", "au", "au"),
+    ("ं", "ṃ ṁ", "M", "M .n"),
+    ("ः", "ḥ", "H", "H"),
+    ("क", "k", "k", "k"),
+    ("ख", "kh", "kh", "kh"),
+    ("ग", "g", "g", "g"),
+    ("घ", "gh", "gh", "gh"),
+    ("ङ", "ṅ", "G", "~N"),
+    ("च", "c", "c", "ch"),
+    ("छ", "ch", "ch", "Ch chh"),
+    ("ज", "j", "j", "j"),
+    ("झ", "jh", "jh", "jh"),
+    ("ञ", "ñ", "J", "~n"),
+    ("ट", "ṭ", "T", "T"),
+    ("ठ", "ṭh", "Th", "Th"),
+    ("ड", "ḍ", "D", "D"),
+    ("ढ", "ḍh", "Dh", "Dh"),
+    ("ण", "ṇ", "N", "N"),
+    ("त", "t", "t", "t"),
+    ("थ", "th", "th", "th"),
+    ("द", "d", "d", "d"),
+    ("ध", "dh", "dh", "dh"),
+    ("न", "n", "n", "n"),
+    ("प", "p", "p", "p"),
+    ("फ", "ph", "ph", "ph"),
+    ("ब", "b", "b", "b"),
+    ("भ", "bh", "bh", "bh"),
+    ("म", "m", "m", "m"),
+    ("य", "y", "y", "y"),
+    ("र", "r", "r", "r"),
+    ("ल", "l", "l", "l"),
+    ("व", "v", "v", "v w"),
+    ("श", "ś", "z", "sh"),
+    ("ष", "ṣ", "S", "Sh shh"),
+    ("स", "s", "s", "s"),
+    ("ह", "h", "h", "h"),
+    ("क्ष", "kṣ", "kS", "x kSh"),
+    ("ज्ञ", "jñ", "jJ", "GY j~n"),
+]
+
+# Loose spellings typed without diacritics, with the extra cost of each reading.
+LOOSE = [
+    ("a", "आ", 2),
+    ("i", "ई", 2),
+    ("u", "ऊ", 2),
+    ("ee", "ई", 0),
+    ("oo", "ऊ", 0),
+    ("ri", "ऋ", 1),
+    ("ru", "ऋ", 2),
+    ("ch", "च", 0),
+    ("chh", "छ", 0),
+    ("t", "ट", 2),
+    ("th", "ठ", 2),
+    ("d", "ड", 2),
+    ("dh", "ढ", 2),
+    ("n", "ण", 2),
+    ("n", "ञ", 3),
+    ("n", "ङ", 3),
+    ("n", "ं", 2),
+    ("m", "ं", 1),
+    ("s", "श", 2),
+    ("s", "ष", 2),
+    ("sh", "श", 0),
+    ("sh", "ष", 1),
+    ("h", "ः", 2),
+    ("f", "फ", 1),
+    ("w", "व", 0),
+    ("x", "क्ष", 0),
+    ("ksh", "क्ष", 0),
+    ("gy", "ज्ञ", 1),
+    ("jn", "ज्ञ", 1),
+]
+
+BEAM_WIDTH = 64
+HIATUS_COST = 3
+CANDIDATE_LIMIT = 10
+DICTIONARY_LIMIT = 256
+
+
+@dataclass(frozen=True)
+class Unit:
+    """Class to represent one Devanagari unit a Roman spelling stands for."""
+
+    devanagari: str
+    cost: int
+
+    @property
+    def is_vowel(self) -> bool:
+        """Return whether the unit is an independent vowel."""
+        return self.devanagari in VOWELS
+
+    @property
+    def is_mark(self) -> bool:
+        """Return whether the unit is an anusvaara or a visarga."""
+        return self.devanagari in MARKS
+
+
+def _compile() -> dict:
+    """Compile every spelling of every scheme into a trie."""
+
+    trie = {}
+
+    def insert(spelling: str, unit: Unit):
+        node = trie
+        for char in spelling:
+            node = node.setdefault(char, {})
+        units = node.setdefault("", [])
+        if all(u.devanagari != unit.devanagari for u in units):
+            units.append(unit)
+        else:
+            units[:] = [
+                (
+                    min(u, unit, key=lambda x: x.cost)
+                    if u.devanagari == unit.devanagari
+                    else u
+                )
+                for u in units
+            ]
+
+    for devanagari, *spellings in SCHEMES:
+        for spelling in " ".join(spellings).split():
+            insert(spelling, Unit(devanagari, 0))
+            if spelling.lower() != spelling:
+                insert(spelling.lower(), Unit(devanagari, 1))
+
+    for spelling, devanagari, cost in LOOSE:
+        insert(spelling, Unit(devanagari, cost))
+
+    return trie
+
+
+TRIE = _compile()
+
+
+def render(units: list[Unit]) -> str:
+    """Join units into Devanagari, adding vowel signs and viramas."""
+
+    text = []
+    after_consonant = False
+
+    for unit in units:
+
+        if unit.is_vowel:
+            text.append(VOWELS[unit.devanagari] if after_consonant else unit.devanagari)
+            after_consonant = False
+            continue
+
+        if after_consonant:
+            text.append(VIRAMA)
+
+        text.append(unit.devanagari)
+        after_consonant = not unit.is_mark
+
+    if after_consonant:
+        text.append(VIRAMA)
+
+    return "".join(text)
+
+
+def _matches(word: str, start: int) -> list[tuple[int, Unit]]:
+    """Return the units of every spelling in the trie starting at a position."""
+
+    matches = []
+    node = TRIE
+
+    for end in range(start, len(word)):
+        node = node.get(word[end])
+        if node is None:
+            break
+        matches.extend((end + 1, unit) for unit in node.get("", ()))
+
+    return matches
+
+
+@lru_cache(maxsize=4096)
+def candidates(word: str, limit: int = CANDIDATE_LIMIT) -> tuple[str, ...]:
+    """Return Devanagari readings of a Romanized word, cheapest first."""
+
+    word = word.strip()
+
+    # beams[i] holds the cheapest partial readings of word[:i].
+    beams: list[list[tuple[int, tuple[Unit, ...]]]] = [[] for _ in range(len(word) + 1)]
+    beams[0] = [(0, ())]
+
+    for start in range(len(word)):
+
+        if not beams[start]:
+            continue
+
+        matches = _matches(word, start)
+        longest = max((end for end, _ in matches), default=start)
+
+        for cost, units in sorted(beams[start], key=lambda beam: beam[0])[:BEAM_WIDTH]:
+
+            after_vowel = bool(units) and (units[-1].is_vowel or units[-1].is_mark)
+
+            for end, unit in matches:
+
+                # Nothing but a consonant can follow an anusvaara or visarga.
+                if unit.is_vowel and units and units[-1].is_mark:
+                    continue
+
+                # Shorter matches than the longest one cost a little extra, and
+                # so do vowels in hiatus, which are rare in Sanskrit words.
+                extra = unit.cost + (end < longest)
+                extra += HIATUS_COST * (unit.is_vowel and after_vowel)
+
+                beams[end].append((cost + extra, units + (unit,)))
+
+    readings = {}
+    for cost, units in sorted(beams[-1], key=lambda beam: beam[0]):
+        reading = render(list(units))
+        readings.setdefault(reading, cost)
+
+    return tuple(readings)[:limit] if word else ()
+
+
+def dictionary_candidates(
+    word: str, filename: pathlib.Path, length: int | None = None
+) -> tuple[str, ...]:
+    """Return the readings of a word found in a word list, cheapest first.
+
+    Only the readings are cached, so a word list saved in the meantime is used.
+    """
+
+    lexicon = get_lexicon(filename)
+
+    return tuple(
+        reading
+        for reading in candidates(word, limit=DICTIONARY_LIMIT)
+        if reading in lexicon and (length is None or count_aksharas(reading) == length)
+    )
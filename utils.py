@@ -1,18 +1,52 @@
 """Utility functions for the project."""
 
-import time
+from functools import lru_cache
+
 import streamlit as st
 
-from google.transliteration import transliterate_word
+from dictionary import DICTIONARY
+from engine import GuessOutcome
+from instrumentation import timed
+
+
+ONLINE_TRANSLITERATION = True
+
+
+@lru_cache(maxsize=None)
+def get_ui_text(filename: str = "ui.yml") -> dict:
+    """Return the texts of the interface, read once per process."""
+
+    # Imported here so the app only pays for it on the first rerun.
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    with open(filename, "r", encoding="utf-8") as file:
+        return yaml.safe_load(file)
 
-from dictionary import is_word_in_dictionary
-from word_processor import Word
 
+@timed("transliterate")
+def transliteration_options(word: str, length: int | None = None) -> None:
+    """Transliterate a word from one script to another.
 
-def transliteration_options(word: str) -> None:
-    """Transliterate a word from one script to another."""
+    Readings found in the dictionary come from the local transliterator. The
+    online transliteration is only asked when none of them is a valid word.
+    """
 
-    st.session_state.options = transliterate_word(word, lang_code="sa")
+    # Imported here since only guesses not in Devanagari need it.
+    # pylint: disable=import-outside-toplevel
+    from transliterate import candidates, dictionary_candidates
+
+    options = list(dictionary_candidates(word, DICTIONARY, length))
+
+    if not options and ONLINE_TRANSLITERATION:
+        # Imported here so the app never pays for it unless it is needed.
+        from google.transliteration import transliterate_word
+
+        try:
+            options = transliterate_word(word, lang_code="sa")
+        except Exception:  # pylint: disable=broad-except
+            options = []
+
+    st.session_state.options = options or list(candidates(word))
 
 
 def wait_for_guess_confirmation() -> None:
@@ -36,41 +70,10 @@ def select_geuss() -> None:
         st.rerun()  # Force rerun to process confirmed guess
 
 
-def check_guess_word_length(guess_word: Word, word_length: int) -> None:
-    """Check if the word is of the correct length."""
-
-    if len(guess_word.aksharas) != word_length:
-
-        message = "Invalid guess! "
-        message += f"Your guess has {len(guess_word.aksharas)} Aksharas. "
-        message += f"Please guess a word with {word_length} Aksharas."
-        st.error(message)
-        st.session_state.valid_guess = None
-
-        time.sleep(5)
-
-        st.rerun()
-
-
-def is_guess_word_in_dictionary(guess_word: Word) -> None:
-    """Check if the word is in the dictionary."""
-
-    if not is_word_in_dictionary(guess_word.word):
-        st.error(f"Invalid guess! The word {guess_word.word} is not in the dictionary.")
-        st.session_state.valid_guess = None
-
-        time.sleep(5)
-
-        st.rerun()
-
-
-def is_word_previously_guessed(guess_word: Word) -> None:
-    """Check if the word has been previously guessed."""
-
-    if guess_word.word in st.session_state.previous_guesses:
-        st.error(f"Invalid guess! The word {guess_word.word} has already been guessed.")
-        st.session_state.valid_guess = None
-
-        time.sleep(5)
+def show_invalid_guess(result: GuessOutcome) -> None:
+    """Show why a guess was rejected and clear it for the next input."""
 
-        st.rerun()
+    st.error(result.message)
+    if result.suggestions:
+        st.info(f"Did you mean {', '.join(result.suggestions)}?")
+    st.session_state.valid_guess = None
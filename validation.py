@@ -0,0 +1,52 @@
+"""Module to validate a guess in a single pass."""
+
+import pathlib
+from dataclasses import dataclass
+
+from dictionary import DICTIONARY
+from lexicon import get_lexicon
+from suggestions import get_suggestion_index
+from word_processor import Word
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    """Class to represent the outcome of validating a guess."""
+
+    valid: bool
+    message: str = ""
+    suggestions: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class GuessValidator:
+    """Class to check the length, the dictionary and the repetition of a guess."""
+
+    length: int
+    filename: pathlib.Path = DICTIONARY
+
+    def validate(self, guess: Word, previous_guesses: set[str]) -> ValidationResult:
+        """Return whether a guess can be played, with the reason if it cannot."""
+
+        if len(guess.aksharas) != self.length:
+
+            message = "Invalid guess! "
+            message += f"Your guess has {len(guess.aksharas)} Aksharas. "
+            message += f"Please guess a word with {self.length} Aksharas."
+            return ValidationResult(False, message)
+
+        if guess.word not in get_lexicon(self.filename):
+            index = get_suggestion_index(self.length, self.filename)
+            return ValidationResult(
+                False,
+                f"Invalid guess! The word {guess.word} is not in the dictionary.",
+                tuple(index.suggest(guess.word, exclude=previous_guesses)),
+            )
+
+        if guess.word in previous_guesses:
+            return ValidationResult(
+                False,
+                f"Invalid guess! The word {guess.word} has already been guessed.",
+            )
+
+        return ValidationResult(True)
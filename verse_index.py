@@ -0,0 +1,344 @@
+"""Module to find the verses containing a word through an Akshara n-gram index.
+
+Every line of a source holds a text and a reference as its first and last
+columns, which covers both the verses of shlokas.csv and the entries of
+amara.csv. The words of each text are split into Aksharas, and every Akshara
+and pair of consecutive Aksharas points to the words and offsets where it
+occurs. A search retrieves the words sharing the n-grams of the stem of the
+query and then checks the Varnas, so inflected forms of the word match too.
+A word is taken as an inflected form when the Varnas after the stem are a
+case ending, and as a compound otherwise.
+
+Build the index of a source with `python verse_index.py data/shlokas.csv`.
+"""
+
+import argparse
+import pathlib
+import pickle
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from akshara import varnakaarya as vk
+
+from lexicon import cache_path
+from word_processor import SVARAS, get_vinyaasa
+
+
+SUFFIX = "verses.pickle"
+
+# Raised whenever VerseIndex changes, so an index pickled before is rebuilt.
+VERSION = 3
+
+# The case endings of the common declensions, as written after a Vyanjana,
+# with the Svara replacing the final one of the stem. Sandhi forms like रामो
+# and रामं are included.
+ENDINGS = (
+    # a-stems
+    "", "ः", "ं", "म्", "ौ", "ाः", "ान्", "ेन", "ेण", "ाभ्याम्", "ैः", "ाय",
+    "ेभ्यः", "ात्", "ाद्", "स्य", "योः", "ानाम्", "ाणाम्", "े", "ेषु", "ा", "ो",
+    "ानि", "ाणि",
+    # ā-stems
+    "ाम्", "या", "यै", "ायै", "ायाः", "ायाम्", "ासु", "ाभिः", "ाभ्यः",
+    # i-stems
+    "ि", "िः", "िम्", "िं", "िणा", "िना", "ये", "ेः", "ी", "यः", "ीन्", "िभिः",
+    "िभ्यः", "ीनाम्", "ीणाम्", "िषु",
+    # u-stems
+    "ु", "ुः", "ुम्", "ुं", "ुना", "ुणा", "वे", "ोः", "ू", "वः", "ून्", "ुभिः",
+    "ुभ्यः", "ूनाम्", "ूणाम्", "ुषु",
+    # ī-stems
+    "्यौ", "्यः", "ीम्", "्या", "्यै", "्याः", "्याम्", "ीषु", "ीभिः",
+    # consonant stems
+    "ि", "ाम्", "सु",
+)  # fmt: skip
+
+# Anything but Devanagari letters and signs separates words; this drops the
+# dandas, digits, the avagraha and stray punctuation.
+NON_LETTERS = re.compile(r"[^\u0900-\u093C\u093E-\u0963\u0971-\u097F]+")
+
+
+@dataclass(frozen=True)
+class Match:
+    """Class to represent a verse containing a word."""
+
+    verse: int
+    text: str
+    reference: str
+    token: str
+    offset: int
+    rank: int
+
+
+def _varnas(aksharas: list[str]) -> tuple[str, ...]:
+    """Return the Varnas of some Aksharas."""
+    return tuple(v for akshara in aksharas for v in get_vinyaasa(akshara))
+
+
+def _stem(aksharas: list[str]) -> tuple[str, ...]:
+    """Return the Varnas of a word without its final Svara."""
+
+    varnas = _varnas(aksharas)
+    if len(varnas) > 1 and varnas[-1] in SVARAS:
+        varnas = varnas[:-1]
+
+    return varnas
+
+
+@lru_cache(maxsize=None)
+def endings() -> frozenset[tuple[str, ...]]:
+    """Return the Varnas of every case ending."""
+
+    # Each ending is written after क, whose Vyanjana is then dropped.
+    return frozenset(_varnas(vk.get_akshara("क" + ending))[1:] for ending in ENDINGS)
+
+
+@dataclass
+class VerseIndex:
+    """Class to hold the texts of a source and their Akshara n-gram postings."""
+
+    texts: list[str] = field(default_factory=list)
+    references: list[str] = field(default_factory=list)
+
+    token_verses: list[int] = field(default_factory=list)
+    token_aksharas: list[tuple[str, ...]] = field(default_factory=list)
+    token_varnas: list[tuple[str, ...]] = field(default_factory=list)
+    token_starts: list[tuple[int, ...]] = field(default_factory=list)
+    postings: dict[tuple[str, ...], list[tuple[int, int]]] = field(default_factory=dict)
+    initials: dict[str, list[int]] = field(default_factory=dict)
+    forms: dict[tuple[str, ...], list[int]] = field(default_factory=dict)
+
+    @classmethod
+    def from_csv(cls, filename: pathlib.Path) -> "VerseIndex":
+        """Build the index of a source with text and reference columns."""
+
+        index = cls()
+
+        with open(filename, "r", encoding="utf-8") as file:
+            for line in file:
+
+                columns = line.rstrip("\n").split(",")
+                if len(columns) < 2:
+                    continue
+
+                verse = len(index.texts)
+                index.texts.append(columns[0])
+                index.references.append(columns[-1])
+
+                for token in NON_LETTERS.split(columns[0]):
+                    if token:
+                        index.add(verse, token)
+
+        return index
+
+    def add(self, verse: int, token: str):
+        """Add a word of a verse to the index."""
+
+        try:
+            aksharas = tuple(vk.get_akshara(token))
+        except AssertionError:
+            return
+
+        token_id = len(self.token_aksharas)
+        self.token_verses.append(verse)
+        self.token_aksharas.append(aksharas)
+
+        varnas, starts = [], []
+        for akshara in aksharas:
+            starts.append(len(varnas))
+            varnas.extend(get_vinyaasa(akshara))
+        self.token_varnas.append(tuple(varnas))
+        self.token_starts.append(tuple(starts))
+        self.forms.setdefault(tuple(varnas), []).append(token_id)
+
+        self.initials.setdefault(aksharas[0], []).append(token_id)
+
+        for offset, akshara in enumerate(aksharas):
+            self.postings.setdefault((akshara,), []).append((token_id, offset))
+            if offset + 1 < len(aksharas):
+                key = (akshara, aksharas[offset + 1])
+                self.postings.setdefault(key, []).append((token_id, offset))
+
+    def _candidates(self, aksharas: list[str]) -> set[tuple[int, int]]:
+        """Return the words and offsets where a sequence of Aksharas may start."""
+
+        if len(aksharas) == 1:
+            return set(self.postings.get((aksharas[0],), ()))
+
+        bigrams = list(zip(aksharas, aksharas[1:]))
+        candidates = set(self.postings.get(bigrams[0], ()))
+
+        for shift, bigram in enumerate(bigrams[1:], start=1):
+            if not candidates:
+                break
+            following = set(self.postings.get(bigram, ()))
+            candidates = {
+                (token, offset)
+                for token, offset in candidates
+                if (token, offset + shift) in following
+            }
+
+        return candidates
+
+    def search(self, word: str, limit: int = 20) -> list[Match]:
+        """Return the verses containing a word or its inflected forms.
+
+        Verses where the word occurs as it is come first, then those with an
+        inflected form and then those with the word inside a compound, or
+        starting one.
+        """
+
+        try:
+            aksharas = vk.get_akshara(word)
+        except (AssertionError, IndexError):
+            return []
+
+        if not aksharas:
+            return []
+
+        stem = _stem(aksharas)
+
+        # The word itself and its inflected forms are looked up whole.
+        best = {}
+        for ending in ((), *endings()):
+            for token in self.forms.get(stem + ending, ()):
+                rank = 3 if "".join(self.token_aksharas[token]) == word else 2
+                verse = self.token_verses[token]
+                if verse not in best or rank > best[verse][0]:
+                    best[verse] = (rank, token, 0)
+
+        # The last Akshara changes with the inflection, so only the ones before
+        # it are looked up. A word of a single Akshara is inside too many
+        # others, so it is only looked up at the start of a word.
+        if len(aksharas) > 1:
+            candidates = sorted(self._candidates(aksharas[:-1]))
+        else:
+            candidates = [(token, 0) for token in self.initials.get(aksharas[0], ())]
+
+        # Then the compounds, in the order of the verses, until there are enough.
+        compounds = 0
+        for token, offset in candidates:
+
+            if compounds >= limit:
+                break
+
+            verse = self.token_verses[token]
+            if verse in best:
+                continue
+
+            start = self.token_starts[token][offset]
+            if self.token_varnas[token][start : start + len(stem)] == stem:
+                best[verse] = (1, token, offset)
+                compounds += 1
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))
+
+        return [
+            Match(
+                verse,
+                self.texts[verse],
+                self.references[verse],
+                "".join(self.token_aksharas[token]),
+                offset,
+                rank,
+            )
+            for verse, (rank, token, offset) in ranked[:limit]
+        ]
+
+    def save(self, path: pathlib.Path):
+        """Write the index to a binary file."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp")
+
+        with open(tmp, "wb") as file:
+            pickle.dump((VERSION, self), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "VerseIndex":
+        """Read an index written by `save` for the current version."""
+
+        with open(path, "rb") as file:
+            try:
+                version, index = pickle.load(file)
+            except (
+                pickle.UnpicklingError,
+                EOFError,
+                AttributeError,
+                TypeError,
+                ValueError,
+            ):
+                version, index = None, None
+
+        if version != VERSION or not isinstance(index, cls):
+            raise ValueError(f"{path} is not a verse index of version {VERSION}.")
+
+        return index
+
+
+_indexes: dict[str, VerseIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def build(filename: pathlib.Path) -> VerseIndex:
+    """Build the index of a source and save it under the cache directory."""
+
+    index = VerseIndex.from_csv(filename)
+    index.save(cache_path(filename, SUFFIX))
+
+    return index
+
+
+def get_verse_index(filename: pathlib.Path = "data/shlokas.csv") -> VerseIndex:
+    """Return the shared index of a source, building and saving it if needed."""
+
+    key = pathlib.Path(filename).as_posix()
+
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                # Decomposed here once, rather than on the first search.
+                endings()
+
+                path = cache_path(filename, SUFFIX)
+                try:
+                    index = VerseIndex.load(path)
+                except (OSError, ValueError):
+                    index = VerseIndex.from_csv(filename)
+                    try:
+                        index.save(path)
+                    except OSError:
+                        pass
+                _indexes[key] = index
+
+    return index
+
+
+def main():
+    """Build the index of a source and optionally search it."""
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("filename", type=pathlib.Path)
+    parser.add_argument("words", nargs="*")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build(args.filename)
+    print(f"{len(index.texts)} texts indexed in {time.perf_counter() - start:.2f}s")
+
+    for word in args.words:
+        start = time.perf_counter()
+        matches = index.search(word)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{word}: {len(matches)} matches in {elapsed:.2f} ms")
+        for match in matches:
+            print(f"  [{match.rank}] {match.reference} {match.token}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Module to warm up the shared structures of the game in the background.
+
+The first session of a fresh process would otherwise load the word lists,
+build the candidate index and open the caches while its user waits. The app
+starts a daemon thread doing it once per process, right after its imports,
+so most of it is done by the time the first guess is submitted. Every step
+only fills a process-wide cache the game would fill on first use anyway, so
+a step that fails or is not finished yet only means the game does it itself.
+
+How long the imports and the first rerun took is recorded once per process,
+together with the time of every warm-up step, in the instrumentation and in
+the log.
+"""
+
+import pathlib
+import threading
+import time
+
+from instrumentation import observe
+from log_pipeline import get_logger
+
+
+_timings: dict[str, float] = {}
+_timings_lock = threading.Lock()
+_thread: threading.Thread | None = None
+
+
+def _record(name: str, seconds: float) -> bool:
+    """Record a startup timing, returning False if it was already recorded."""
+
+    with _timings_lock:
+        if name in _timings:
+            return False
+        _timings[name] = seconds
+
+    observe(f"startup.{name}", seconds)
+    return True
+
+
+def mark(name: str, start: float):
+    """Record the time since start as a startup timing, once per process."""
+
+    seconds = time.perf_counter() - start
+    if _record(name, seconds):
+        get_logger(__name__).info("Startup %s took %.0f ms", name, seconds * 1e3)
+
+
+def timings() -> dict[str, float]:
+    """Return the startup timings recorded so far, in seconds."""
+
+    with _timings_lock:
+        return dict(_timings)
+
+
+def _steps(word_list: pathlib.Path, length: int, dictionary: pathlib.Path):
+    """Return the warm-up steps, most useful to the first game first."""
+
+    # pylint: disable=import-outside-toplevel
+    from candidates import get_candidate_index
+    from compiled_lexicon import open_compiled
+    from lexicon import get_lexicon
+    from sampler import get_sampler
+    from solver import get_solver
+    from suggestions import get_suggestion_index
+    from verse_index import get_verse_index
+
+    return [
+        ("lexicon", lambda: get_lexicon(word_list).bucket(length)),
+        ("sampler", lambda: get_sampler(length, word_list)),
+        ("compiled_lexicon", open_compiled),
+        ("dictionary", lambda: get_lexicon(dictionary)),
+        ("candidate_index", lambda: get_candidate_index(length, word_list)),
+        ("suggestions", lambda: get_suggestion_index(length, dictionary)),
+        ("verse_index", get_verse_index),
+        ("solver", lambda: get_solver(length, word_list).opener()),
+    ]
+
+
+def _warm_up(word_list: pathlib.Path, length: int, dictionary: pathlib.Path):
+    """Run every warm-up step, timing each of them."""
+
+    start = time.perf_counter()
+
+    for name, step in _steps(word_list, length, dictionary):
+        step_start = time.perf_counter()
+        try:
+            step()
+        except Exception:  # pylint: disable=broad-except
+            get_logger(__name__).warning("Warm-up step %s failed", name, exc_info=True)
+            continue
+        _record(f"warmup.{name}", time.perf_counter() - step_start)
+
+    mark("warmup", start)
+
+
+def start_warmup(
+    word_list: pathlib.Path, length: int, dictionary: pathlib.Path
+) -> threading.Thread:
+    """Start warming up the structures of a word list, once per process."""
+
+    global _thread
+
+    if _thread is None:
+        with _timings_lock:
+            if _thread is None:
+                thread = threading.Thread(
+                    target=_warm_up,
+                    args=(word_list, length, dictionary),
+                    name="warmup",
+                    daemon=True,
+                )
+                thread.start()
+                _thread = thread
+
+    return _thread
@@ -1,42 +1,78 @@
 """Module to perform word processing tasks."""
 
+import sys
 from dataclasses import dataclass, field
+from functools import lru_cache
 
 from akshara import varnakaarya as vk
 
+import compiled_lexicon
+
 # import requests
 # from requests.exceptions import HTTPError
 
 
 SVARAS = ["अ", "आ", "इ", "ई", "उ", "ऊ", "ऋ", "ॠ", "ऌ", "ॡ", "ए", "ऐ", "ओ", "औ"]
 
+_SVARAS = frozenset(SVARAS)
+
+WORD_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=None)
+def get_vinyaasa(akshara: str) -> tuple[str, ...]:
+    """Return the Vinyaasa of an Akshara with interned Varnas."""
+    return tuple(sys.intern(v) for v in vk.get_vinyaasa(akshara))
 
-@dataclass
+
+@dataclass(slots=True)
 class Word:
-    """Class to interact with the Akshara API."""
+    """Class to interact with the Akshara API.
+
+    The word is decomposed once on construction. Words are shared through
+    `get_word`, so their attributes must not be modified.
+    """
 
     word: str
     aksharas: list[str] = field(default_factory=list, init=False)
 
-    base_url: str = field(default="https://akshara-api.onrender.com", init=False)
     svaras: list[str] = field(default_factory=list, init=False)
     vyanjanas: list[list[str]] = field(default_factory=list, init=False)
+    vinyaasas: list[tuple[str, ...]] = field(default_factory=list, init=False)
+
+    svara_signature: list[str] = field(default_factory=list, init=False, repr=False)
+    vyanjana_signature: list[list[str]] = field(
+        default_factory=list, init=False, repr=False
+    )
 
     def __post_init__(self):
         """Fetch the Aksharas for the given word."""
 
-        self.aksharas = self.fetch_aksharas(self.word)
+        entry = compiled_lexicon.lookup(self.word)
 
-        for akshara in self.aksharas:
-            vinyaasa = self.fetch_vinyaasa(akshara)
-            svara = [v for v in vinyaasa if v in SVARAS][0]
-            vyanjana = [v for v in vinyaasa if v not in SVARAS]
+        if entry is None:
+            self.aksharas = self.fetch_aksharas(self.word)
+            self.vinyaasas = [get_vinyaasa(akshara) for akshara in self.aksharas]
+        else:
+            self.aksharas = [akshara for akshara, _ in entry]
+            self.vinyaasas = [
+                tuple(sys.intern(v) for v in vinyaasa) for _, vinyaasa in entry
+            ]
+
+        for vinyaasa in self.vinyaasas:
+            svara = [v for v in vinyaasa if v in _SVARAS][0]
+            vyanjana = [v for v in vinyaasa if v not in _SVARAS]
             self.svaras.append(svara)
             self.vyanjanas.append(vyanjana)
+            self.vyanjana_signature.append(
+                [v if v not in _SVARAS else "-" for v in vinyaasa]
+            )
+
+        self.svara_signature = list(self.svaras)
 
     def fetch_vinyaasa(self, word: str) -> list[str]:
         """Fetch the Vinyaasas for a given word."""
-        return vk.get_vinyaasa(word)
+        return list(get_vinyaasa(word))
 
     def fetch_aksharas(self, word: str) -> list[str]:
         """Fetch the Aksharas for a given word."""
@@ -69,24 +105,14 @@ class Word:
 
     def get_svara_signature(self) -> list[str]:
         """Return the Svara signature of the word."""
-
-        signature = []
-
-        for akshara in self.aksharas:
-            vinyaasa = self.fetch_vinyaasa(akshara)
-            svara = [v for v in vinyaasa if v in SVARAS][0]
-            signature.append(svara)
-
-        return signature
+        return self.svara_signature
 
     def get_vyanjana_signature(self) -> list[list[str]]:
         """Return the Vyanjana signature of the word."""
+        return self.vyanjana_signature
 
-        signature = []
-
-        for akshara in self.aksharas:
-            vinyaasa = self.fetch_vinyaasa(akshara)
-            vyanjana = [v if v not in SVARAS else "-" for v in vinyaasa]
-            signature.append(vyanjana)
 
-        return signature
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def get_word(word: str) -> Word:
+    """Return the shared, decomposed Word for a string."""
+    return Word(word)